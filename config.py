@@ -59,6 +59,8 @@ class Settings(BaseSettings):
     LLM_TEMPERATURE_DETECTION: float = 0.1
     LLM_TEMPERATURE_RESPONSE: float = 0.7
     LLM_REQUEST_TIMEOUT: int = 5  # Reduced timeout for faster failures
+    ENABLE_FAST_PATH: bool = True  # Skip LLM detection when keyword pre-screen finds an obvious scam
+    FAST_PATH_HIGH_CONFIDENCE: float = 0.9  # Pre-screen confidence at/above this is an obvious scam
     
     # Rate Limiting Configuration
     MIN_REQUEST_INTERVAL: float = 12.0  # Minimum seconds between requests (5 req/min)
@@ -350,7 +350,7 @@ async def handle_message(
             
             # Scam detection (uses keyword-based fallback primarily, fast)
             try:
-                detection_result = scam_detector.detect_scam(message_text, session.messages)
+                detection_result = await scam_detector.adetect_scam(message_text, session.messages)
             except Exception as e:
                 logger.error(f"Scam detection error: {e}")
                 detection_result = {
@@ -467,7 +467,8 @@ async def handle_message(
                             conversation_history=session.messages,
                             persona=session.persona,
                             scam_type=scam_type,
-                            extracted_intel=session.intelligence.model_dump()
+                            extracted_intel=session.intelligence.to_guvi_dict(),
+                            session_id=session_id
                         ),
                         timeout=20.0
                     )
@@ -538,7 +539,7 @@ async def handle_message(
                     session_id=session_id,
                     scam_detected=session.scam_detected,
                     total_messages=session.message_count,
-                    extracted_intelligence=session.intelligence.model_dump(),
+                    extracted_intelligence=session.intelligence.to_guvi_dict(),
                     agent_notes=session.agent_notes
                 )
                 
@@ -618,7 +619,7 @@ async def get_session_info(
         "messageCount": session.message_count,
         "scamDetected": session.scam_detected,
         "engagementActive": session.engagement_active,
-        "intelligence": session.intelligence.model_dump(),
+        "intelligence": session.intelligence.to_guvi_dict(),
         "createdAt": session.created_at.isoformat(),
         "lastActivity": session.last_activity.isoformat(),
         "currentIntent": session.current_intent,
@@ -93,19 +93,33 @@ class ExtractedIntelligence(BaseModel):
         self.phoneNumbers = [item.value for item in self.phoneNumbersDetailed]
         self.suspiciousKeywords = [item.value for item in self.suspiciousKeywordsDetailed]
         
-        # Calculate overall confidence
-        all_items = (
-            self.bankAccountsDetailed + self.upiIdsDetailed + 
-            self.phishingLinksDetailed + self.phoneNumbersDetailed +
-            self.suspiciousKeywordsDetailed
-        )
-        if all_items:
-            self.overallConfidence = sum(item.confidence for item in all_items) / len(all_items)
-            self.highConfidenceCount = sum(1 for item in all_items if item.confidence > 0.7)
+        # Calculate overall confidence from one flat column of confidences (no concatenated item list)
+        confidences = [
+            item.confidence
+            for items in (
+                self.bankAccountsDetailed, self.upiIdsDetailed,
+                self.phishingLinksDetailed, self.phoneNumbersDetailed,
+                self.suspiciousKeywordsDetailed
+            )
+            for item in items
+        ]
+        if confidences:
+            self.overallConfidence = sum(confidences) / len(confidences)
+            self.highConfidenceCount = sum(1 for c in confidences if c > 0.7)
         else:
             self.overallConfidence = 0.0
             self.highConfidenceCount = 0
     
+    def to_guvi_dict(self) -> Dict[str, List[str]]:
+        """Fast equivalent of model_dump() for the fixed GUVI field set (detailed fields excluded)"""
+        return {
+            "bankAccounts": list(self.bankAccounts),
+            "upiIds": list(self.upiIds),
+            "phishingLinks": list(self.phishingLinks),
+            "phoneNumbers": list(self.phoneNumbers),
+            "suspiciousKeywords": list(self.suspiciousKeywords)
+        }
+    
     def get_high_confidence_items(self, threshold: float = 0.7) -> Dict[str, List[IntelligenceItem]]:
         """Get only high-confidence intelligence items"""
         return {
@@ -29,7 +29,7 @@ class SessionData:
             "session_id": self.session_id,
             "messages": [m.model_dump() for m in self.messages],
             "scam_detected": self.scam_detected,
-            "intelligence": self.intelligence.model_dump(),
+            "intelligence": self.intelligence.to_guvi_dict(),
             "agent_notes": self.agent_notes,
             "created_at": self.created_at.isoformat(),
             "last_activity": self.last_activity.isoformat(),
@@ -1,6 +1,4 @@
 from typing import List, Optional, Dict, Any
-from google import genai
-from anthropic import Anthropic
 from config import settings
 from src.models.schemas import Message
 import random
@@ -8,10 +6,26 @@ import logging
 import json
 import re
 import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Pre-compiled patterns for pulling the retry delay out of provider rate-limit errors
+_RETRY_IN_RE = re.compile(r'retry in ([0-9.]+)s')
+_RETRY_DELAY_FIELD_RE = re.compile(r'retryDelay["\']?:\s*["\']?([0-9.]+)s?["\']?')
+
+# Pre-compiled patterns and keyword groups for classifying fallback responses
+_FALLBACK_PHONE_RE = re.compile(r'\+?\d{2}[-\s]?\d{10}|\d{10}')
+_FALLBACK_ACCOUNT_RE = re.compile(r'\d{16}|\d{12}')
+_FALLBACK_TIME_RE = re.compile(r'(\d+)\s*(minute|second|hour)')
+_OTP_WORDS = ('otp', 'pin', 'code', 'verification', 'cvv', '6-digit', '6‑digit')
+_PAYMENT_WORDS = ('payment', 'send money', 'transfer', 'pay', 'amount', 'rupees')
+_LINK_WORDS = ('click', 'link', 'website', 'url', 'download', 'open')
+_ACCOUNT_WORDS = ('account', 'blocked', 'suspend', 'freeze', 'kyc', 'sbi', 'bank')
+_URGENCY_WORDS = ('urgent', 'immediate', 'now', 'minute', 'second', 'expire', 'soon')
+_PRIZE_WORDS = ('won', 'prize', 'winner', 'lottery', 'congratulations', 'reward')
+
 
 def extract_json_from_text(text: str) -> str:
     """Extract JSON object from text that may contain other content"""
@@ -52,6 +66,86 @@ class AIAgent:
         }
     }
     
+    # Most (session, category) cycle cursors kept; the least recently used are dropped first
+    MAX_FALLBACK_CURSORS = 2048
+    
+    # Fallback response templates per message category; {fields} are filled from the scammer message
+    FALLBACK_RESPONSES = {
+        # OTP/PIN requests - act confused about what/where/how
+        "otp": (
+            "what code?? i didnt get anything{phone_hint}",
+            "otp means what exactly? never heard this before",
+            "where shud i look for this code? in my msgs?",
+            "u mean password? or something else",
+            "i checked my phone no new messages came",
+            "code for what purpose exactly?",
+            "how do i find that? is it in app or sms",
+            "which otp r u asking? confused here"
+        ),
+        # Payment/Money requests - vary concern levels
+        "payment": (
+            "how much??  dont have much money rn",
+            "what am i paying for again? need to understand first",
+            "is this payment necessary? sounds fishy",
+            "where do i send it exactly",
+            "never done this before what steps to follow",
+            "will i get refund later or one time thing?"
+        ),
+        # Link clicks - show hesitation
+        "link": (
+            "link? my phone showing security warning",
+            "not sure if i shud click dont want virus",
+            "what will happen if i open it",
+            "is it safe link or scam? how do i know",
+            "cant open it says risk website"
+        ),
+        # Account/Bank issues - react to specific bank mentioned
+        "account": (
+            "wait my {bank_name} has problem?? what happened",
+            "why would it get blocked i didnt do anything wrong",
+            "can i check my balance is everything still there",
+            "this is serious right? shud i go to branch",
+            "how to fix this issue tell me steps"
+        ),
+        # Time pressure - acknowledge and show panic based on time mentioned
+        "urgency": (
+            "ok ok{time_ref} is not much time right? what exactly i need do",
+            "dont panic me im trying to understand first",
+            "this urgent thing making me scared what if i mess up",
+            "slow down! explain step by step plz",
+            "only{time_ref}?? thats too less how can i do fast"
+        ),
+        # Phone number mentioned - acknowledge it
+        "phone": (
+            "is {phone} my number? how u know my number",
+            "that number yours or mine unclear",
+            "i shud call {phone}? or wait for call"
+        ),
+        # Account number mentioned - verify it
+        "account_number": (
+            "is {acc} my account number? need to check",
+            "how did u get my account details",
+            "is this number correct let me verify first"
+        ),
+        # Prize/Lottery - excited confusion
+        "prize": (
+            "really?? but i never entered any lottery",
+            "wow!! how much i won? is it real",
+            "sounds amazing but how u got my details",
+            "what i need to do to claim it tell me"
+        ),
+        # Generic - natural confusion with variations
+        "generic": (
+            "huh? didnt get what u said",
+            "can u say that in simple way",
+            "little confused explain again",
+            "what exactly u want me to do unclear",
+            "sorry not understanding this properly",
+            "ok but how? need more details",
+            "wait ur going too fast slow down"
+        )
+    }
+    
     def __init__(self):
         self.primary_provider = settings.LLM_PROVIDER
         self.available_providers = []
@@ -68,8 +162,18 @@ class AIAgent:
         self.min_request_interval = settings.MIN_REQUEST_INTERVAL  # Minimum seconds between requests
         
         # Track recent responses to avoid repetition
-        self.recent_responses = []  # Store last 5 responses
         self.max_recent_responses = 5
+        self.recent_responses = deque(maxlen=self.max_recent_responses)  # Ring of the last 5 responses
+        
+        # Flat fallback template table with a shuffled cycle of response ids per category
+        self._fallback_templates = []
+        self._fallback_buckets = {}
+        for category, templates in self.FALLBACK_RESPONSES.items():
+            first = len(self._fallback_templates)
+            self._fallback_templates.extend(templates)
+            ids = range(first, len(self._fallback_templates))
+            self._fallback_buckets[category] = tuple(random.sample(ids, len(ids)))
+        self._fallback_cursors = OrderedDict()  # LRU: (session, category) -> position in that category's cycle
         
         # Initialize all available providers dynamically
         self._initialize_providers()
@@ -79,6 +183,7 @@ class AIAgent:
         # Try Anthropic (Claude Haiku 4.5) - Primary
         try:
             if settings.ANTHROPIC_API_KEY and settings.ANTHROPIC_API_KEY != "your-anthropic-api-key-here":
+                from anthropic import Anthropic  # Imported on demand: the SDK is slow to import
                 self.clients['anthropic'] = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
                 self.models['anthropic'] = settings.ANTHROPIC_MODEL
                 self.available_providers.append('anthropic')
@@ -90,6 +195,7 @@ class AIAgent:
         try:
             gemini_keys = settings.get_gemini_api_keys()
             if gemini_keys:
+                from google import genai  # Imported on demand: the SDK is slow to import
                 for idx, api_key in enumerate(gemini_keys):
                     try:
                         client = genai.Client(api_key=api_key)
@@ -115,14 +221,13 @@ class AIAgent:
     def _extract_retry_delay(self, error_msg: str) -> float:
         """Extract retry delay from error message (e.g., 'Please retry in 18.360292146s')"""
         try:
-            import re
-            match = re.search(r'retry in ([0-9.]+)s', error_msg)
+            match = _RETRY_IN_RE.search(error_msg)
             if match:
                 delay = float(match.group(1))
                 logger.info(f"AI Agent: Extracted retry delay: {delay}s")
                 return delay
             # Also check for retryDelay field
-            match = re.search(r'retryDelay["\']?:\s*["\']?([0-9.]+)s?["\']?', error_msg)
+            match = _RETRY_DELAY_FIELD_RE.search(error_msg)
             if match:
                 delay = float(match.group(1))
                 logger.info(f"AI Agent: Extracted retry delay from field: {delay}s")
@@ -353,11 +458,14 @@ class AIAgent:
         persona: str = "cautious_user",
         scam_type: str = "unknown",
         extracted_intel: Dict = None,
-        message_count: int = 0
+        message_count: int = 0,
+        session_id: Optional[str] = None
     ) -> Dict[str, any]:
         """
         Generate a human-like response to the scammer
         
+        session_id keys the fallback response rotation, so sessions never share a cycle
+        
         Returns: {
             'response': str,
             'strategy': str,
@@ -382,7 +490,7 @@ class AIAgent:
         # Build recent responses context to avoid repetition
         recent_context = ""
         if self.recent_responses:
-            recent_context = "\nRECENT RESPONSES YOU USED (DON'T REPEAT THESE):\n" + "\n".join(f"- {r}" for r in self.recent_responses[-3:])
+            recent_context = "\nRECENT RESPONSES YOU USED (DON'T REPEAT THESE):\n" + "\n".join(f"- {r}" for r in list(self.recent_responses)[-3:])
         
         # Build the prompt for the AI
         prompt = f"""You are a REAL PERSON chatting with someone. You don't know you're talking to a scammer.
@@ -439,7 +547,7 @@ Respond with JSON (no markdown):
         # Try each available provider until one succeeds
         if not self.available_providers:
             logger.warning("AI Agent: No LLM providers available - using fallback response")
-            return self._fallback_response(scammer_message, message_count)
+            return self._fallback_response(scammer_message, message_count, session_id)
         
         # Try primary provider first, then fallback to other available providers
         providers_to_try = []
@@ -492,8 +600,6 @@ Respond with JSON (no markdown):
                 # Track successful response to avoid repetition
                 response_text = agent_decision.get('response', '')
                 self.recent_responses.append(response_text)
-                if len(self.recent_responses) > self.max_recent_responses:
-                    self.recent_responses.pop(0)
                 
                 logger.info(f"AI Agent: Successfully generated response with {provider}")
                 return agent_decision
@@ -509,7 +615,7 @@ Respond with JSON (no markdown):
         
         # All providers failed - use fallback
         logger.warning(f"AI Agent: All LLM providers failed (last error: {last_error}) - using fallback response")
-        fallback = self._fallback_response(scammer_message, message_count)
+        fallback = self._fallback_response(scammer_message, message_count, session_id)
         
         # Extra safety: ensure fallback is valid
         if not fallback or not isinstance(fallback, dict):
@@ -556,134 +662,65 @@ Respond with JSON (no markdown):
         
         return "\n".join(items) if items else "None yet"
     
-    def _fallback_response(self, scammer_message: str, message_count: int) -> Dict:
+    def _fallback_response(self, scammer_message: str, message_count: int, session_id: Optional[str] = None) -> Dict:
         """Smart context-aware fallback response with variety and natural language"""
-        import re
-        
         message_lower = scammer_message.lower()
         
         # Extract specific details from scammer message for natural responses
-        phone_match = re.search(r'\+?\d{2}[-\s]?\d{10}|\d{10}', scammer_message)
-        number_match = re.search(r'\d{6}|\d{16}|\d{4}', scammer_message)
-        account_match = re.search(r'\d{16}|\d{12}', scammer_message)
-        time_match = re.search(r'(\d+)\s*(minute|second|hour)', message_lower)
-        
-        # Build varied response pools with natural variations
-        responses = []
-        
-        # OTP/PIN requests - act confused about what/where/how
-        if any(word in message_lower for word in ['otp', 'pin', 'code', 'verification', 'cvv', '6-digit', '6‑digit']):
-            responses = [
-                "what code?? i didnt get anything" + (" on my phone" if phone_match else ""),
-                "otp means what exactly? never heard this before",
-                "where shud i look for this code? in my msgs?",
-                "u mean password? or something else",
-                "i checked my phone no new messages came",
-                "code for what purpose exactly?",
-                "how do i find that? is it in app or sms",
-                "which otp r u asking? confused here"
-            ]
-        
-        # Payment/Money requests - vary concern levels
-        elif any(word in message_lower for word in ['payment', 'send money', 'transfer', 'pay', 'amount', 'rupees']):
-            responses = [
-                "how much??  dont have much money rn",
-                "what am i paying for again? need to understand first",
-                "is this payment necessary? sounds fishy",
-                "where do i send it exactly",
-                "never done this before what steps to follow",
-                "will i get refund later or one time thing?"
-            ]
-        
-        # Link clicks - show hesitation
-        elif any(word in message_lower for word in ['click', 'link', 'website', 'url', 'download', 'open']):
-            responses = [
-                "link? my phone showing security warning",
-                "not sure if i shud click dont want virus",
-                "what will happen if i open it",
-                "is it safe link or scam? how do i know",
-                "cant open it says risk website"
-            ]
-        
-        # Account/Bank issues - react to specific bank mentioned
-        elif any(word in message_lower for word in ['account', 'blocked', 'suspend', 'freeze', 'kyc', 'sbi', 'bank']):
-            bank_name = "account"
+        phone_match = _FALLBACK_PHONE_RE.search(scammer_message)
+        account_match = _FALLBACK_ACCOUNT_RE.search(scammer_message)
+        
+        # Classify into a response pool and collect the details its templates reference
+        fields = {}
+        if any(word in message_lower for word in _OTP_WORDS):
+            category = 'otp'
+            fields['phone_hint'] = " on my phone" if phone_match else ""
+        elif any(word in message_lower for word in _PAYMENT_WORDS):
+            category = 'payment'
+        elif any(word in message_lower for word in _LINK_WORDS):
+            category = 'link'
+        elif any(word in message_lower for word in _ACCOUNT_WORDS):
+            category = 'account'
+            fields['bank_name'] = "account"
             if 'sbi' in message_lower:
-                bank_name = "sbi account"
+                fields['bank_name'] = "sbi account"
             elif 'hdfc' in message_lower:
-                bank_name = "hdfc"
+                fields['bank_name'] = "hdfc"
             elif 'icici' in message_lower:
-                bank_name = "icici"
-            
-            responses = [
-                f"wait my {bank_name} has problem?? what happened",
-                "why would it get blocked i didnt do anything wrong",
-                "can i check my balance is everything still there",
-                "this is serious right? shud i go to branch",
-                "how to fix this issue tell me steps"
-            ]
-        
-        # Time pressure - acknowledge and show panic based on time mentioned
-        elif any(word in message_lower for word in ['urgent', 'immediate', 'now', 'minute', 'second', 'expire', 'soon']):
-            time_ref = f" {time_match.group(0)}" if time_match else ""
-            responses = [
-                f"ok ok{time_ref} is not much time right? what exactly i need do",
-                "dont panic me im trying to understand first",
-                "this urgent thing making me scared what if i mess up",
-                "slow down! explain step by step plz",
-                "only" + time_ref + "?? thats too less how can i do fast"
-            ]
-        
-        # Phone number mentioned - acknowledge it
+                fields['bank_name'] = "icici"
+        elif any(word in message_lower for word in _URGENCY_WORDS):
+            category = 'urgency'
+            time_match = _FALLBACK_TIME_RE.search(message_lower)
+            fields['time_ref'] = f" {time_match.group(0)}" if time_match else ""
         elif phone_match:
-            phone = phone_match.group(0)
-            responses = [
-                f"is {phone} my number? how u know my number",
-                f"that number yours or mine unclear",
-                f"i shud call {phone}? or wait for call"
-            ]
-        
-        # Account number mentioned - verify it
+            category = 'phone'
+            fields['phone'] = phone_match.group(0)
         elif account_match:
+            category = 'account_number'
             acc = account_match.group(0)
-            responses = [
-                f"is {acc[:4]}***{acc[-4:]} my account number? need to check",
-                "how did u get my account details",
-                "is this number correct let me verify first"
-            ]
-        
-        # Prize/Lottery - excited confusion
-        elif any(word in message_lower for word in ['won', 'prize', 'winner', 'lottery', 'congratulations', 'reward']):
-            responses = [
-                "really?? but i never entered any lottery",
-                "wow!! how much i won? is it real",
-                "sounds amazing but how u got my details",
-                "what i need to do to claim it tell me"
-            ]
-        
-        # Generic - natural confusion with variations
+            fields['acc'] = f"{acc[:4]}***{acc[-4:]}"
+        elif any(word in message_lower for word in _PRIZE_WORDS):
+            category = 'prize'
         else:
-            responses = [
-                "huh? didnt get what u said",
-                "can u say that in simple way",
-                "little confused explain again",
-                "what exactly u want me to do unclear",
-                "sorry not understanding this properly",
-                "ok but how? need more details",
-                "wait ur going too fast slow down"
-            ]
-        
-        # Filter out recently used responses to avoid repetition
-        available_responses = [r for r in responses if r not in self.recent_responses]
-        if not available_responses:
-            available_responses = responses  # Reset if all used
-        
-        selected_response = random.choice(available_responses)
+            category = 'generic'
+        
+        # Walk the category's shuffled cycle: a bucket never yields the same id twice in a row.
+        # Each session starts at a random point so sessions do not echo each other
+        bucket = self._fallback_buckets[category]
+        key = (session_id, category)
+        cursor = self._fallback_cursors.pop(key, None)
+        if cursor is None:
+            cursor = random.randrange(len(bucket))
+        response_id = bucket[cursor % len(bucket)]
+        self._fallback_cursors[key] = cursor + 1  # Re-inserted at the most recent end
+        if len(self._fallback_cursors) > self.MAX_FALLBACK_CURSORS:
+            self._fallback_cursors.popitem(last=False)  # An evicted session just restarts at a random point
+        
+        template = self._fallback_templates[response_id]
+        selected_response = template.format(**fields) if fields else template
         
         # Track this response
         self.recent_responses.append(selected_response)
-        if len(self.recent_responses) > self.max_recent_responses:
-            self.recent_responses.pop(0)
         
         return {
             'response': selected_response,
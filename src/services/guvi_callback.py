@@ -61,7 +61,9 @@ class GUVICallback:
     
     def format_intelligence_for_callback(self, intelligence: Any) -> Dict[str, Any]:
         """Format extracted intelligence for GUVI callback"""
-        if hasattr(intelligence, 'model_dump'):
+        if hasattr(intelligence, 'to_guvi_dict'):
+            return intelligence.to_guvi_dict()
+        elif hasattr(intelligence, 'model_dump'):
             return intelligence.model_dump()
         elif hasattr(intelligence, 'dict'):
             return intelligence.dict()
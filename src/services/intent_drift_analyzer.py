@@ -3,6 +3,7 @@ Intent Drift Analyzer - Tracks and analyzes scammer intent changes over conversa
 """
 
 from typing import List, Optional, Dict, Tuple
+from collections import Counter
 from datetime import datetime
 import logging
 
@@ -40,6 +41,22 @@ class IntentDriftAnalyzer:
         ('other', 'other'): 0.0,
     }
     
+    # Both orderings of every pair, so a lookup is a single dict hit
+    _PAIR_SIMILARITY = {
+        **INTENT_SIMILARITY_MATRIX,
+        **{(b, a): score for (a, b), score in INTENT_SIMILARITY_MATRIX.items()}
+    }
+    
+    # Unknown intents - assume moderate difference
+    UNKNOWN_SIMILARITY = 0.5
+    
+    # Canonical string object for each known intent name, so records share the class-level literals.
+    # Unknown intents (free text from the LLM) are kept as-is rather than interned
+    _CANONICAL_INTENTS = {intent: intent for pair in INTENT_SIMILARITY_MATRIX for intent in pair}
+    
+    # Drift magnitudes that count as a deliberate change of strategy
+    STRATEGIC_MAGNITUDES = frozenset((DriftMagnitude.MEDIUM.value, DriftMagnitude.HIGH.value))
+    
     def __init__(self):
         pass
     
@@ -48,21 +65,13 @@ class IntentDriftAnalyzer:
         if intent1 == intent2:
             return 0.0
         
-        # Normalize intent names
-        intent1 = intent1.lower()
-        intent2 = intent2.lower()
-        
-        # Check matrix (order doesn't matter)
-        key1 = (intent1, intent2)
-        key2 = (intent2, intent1)
+        # Fast path: intents are normally already lowercase
+        score = self._PAIR_SIMILARITY.get((intent1, intent2))
+        if score is not None:
+            return score
         
-        if key1 in self.INTENT_SIMILARITY_MATRIX:
-            return self.INTENT_SIMILARITY_MATRIX[key1]
-        elif key2 in self.INTENT_SIMILARITY_MATRIX:
-            return self.INTENT_SIMILARITY_MATRIX[key2]
-        else:
-            # Unknown intents - assume moderate difference
-            return 0.5
+        # Normalize intent names (order doesn't matter)
+        return self._PAIR_SIMILARITY.get((intent1.lower(), intent2.lower()), self.UNKNOWN_SIMILARITY)
     
     def classify_drift_magnitude(self, similarity_score: float) -> DriftMagnitude:
         """Classify drift magnitude based on similarity score"""
@@ -112,7 +121,7 @@ class IntentDriftAnalyzer:
     ) -> IntentRecord:
         """Create intent record for tracking"""
         return IntentRecord(
-            intent=intent,
+            intent=self._CANONICAL_INTENTS.get(intent, intent),
             confidence=confidence,
             timestamp=datetime.now().isoformat(),
             message_number=message_number,
@@ -128,39 +137,36 @@ class IntentDriftAnalyzer:
                 interpretation="No intent data available"
             )
         
-        # Calculate drift events
+        # Single pass: count intents and emit drift events only where the intent changes
         drift_events = []
-        for i in range(1, len(intent_history)):
-            prev_intent = intent_history[i-1].intent
-            curr_intent = intent_history[i].intent
+        intent_counts = Counter()
+        prev_intent = None
+        for record in intent_history:
+            curr_intent = record.intent
+            intent_counts[curr_intent] += 1
             
-            if prev_intent != curr_intent:
+            if prev_intent is not None and prev_intent != curr_intent:
                 similarity = self.calculate_intent_similarity(prev_intent, curr_intent)
                 magnitude = self.classify_drift_magnitude(similarity)
                 
                 drift_events.append(DriftEvent(
                     from_intent=prev_intent,
                     to_intent=curr_intent,
-                    timestamp=intent_history[i].timestamp,
-                    message_number=intent_history[i].message_number,
+                    timestamp=record.timestamp,
+                    message_number=record.message_number,
                     drift_magnitude=magnitude.value,
                     drift_score=similarity
                 ))
+            prev_intent = curr_intent
         
         # Calculate metrics
         total_drifts = len(drift_events)
         total_messages = len(intent_history)
-        drift_rate = total_drifts / total_messages if total_messages > 0 else 0.0
+        drift_rate = total_drifts / total_messages
+        intent_diversity = len(intent_counts)
         
-        # Count unique intents
-        unique_intents = list(set(record.intent for record in intent_history))
-        intent_diversity = len(unique_intents)
-        
-        # Find primary intent (most frequent)
-        intent_counts = {}
-        for record in intent_history:
-            intent_counts[record.intent] = intent_counts.get(record.intent, 0) + 1
-        primary_intent = max(intent_counts, key=intent_counts.get) if intent_counts else None
+        # Primary intent is the most frequent; ties go to the one seen first
+        primary_intent = intent_counts.most_common(1)[0][0]
         
         # Stability score (inverse of drift rate)
         stability_score = 1.0 - drift_rate
@@ -218,10 +224,8 @@ class IntentDriftAnalyzer:
         # Adaptive/Testing: Moderate drift, strategic changes
         if 0.2 <= drift_rate <= 0.4 and intent_diversity == 3:
             # Check if drifts are strategic (mostly medium/high magnitude)
-            high_magnitude_drifts = sum(
-                1 for event in drift_events 
-                if event.drift_magnitude in [DriftMagnitude.MEDIUM.value, DriftMagnitude.HIGH.value]
-            )
+            strategic = self.STRATEGIC_MAGNITUDES
+            high_magnitude_drifts = sum(1 for event in drift_events if event.drift_magnitude in strategic)
             if high_magnitude_drifts >= len(drift_events) * 0.6:
                 return ScammerBehaviorType.ADAPTIVE_TESTING
         
@@ -1,15 +1,43 @@
 from typing import Optional, List, Dict, Any
-from google import genai
-from anthropic import Anthropic
 from config import settings
 from src.models.schemas import Message
+import asyncio
 import logging
 import json
 import hashlib
 import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Pre-compiled patterns for keyword-based fallback detection (run over the lowered message)
+_URL_RE = re.compile(r'http[s]?://[^\s]+')
+_SHORT_URL_RE = re.compile(r'\b(?:bit\.ly|tinyurl|goo\.gl|ow\.ly|short\.link|t\.co)/[a-z0-9\-_]+')
+_SUSPICIOUS_LINK_RE = re.compile(r'\b\w+\.\w+/\w+')
+_INDIAN_PHONE_RE = re.compile(r'(?:\+91|91)?[6-9]\d{9}')
+
+# Static detection instructions, built once at import and sent ahead of each call's message part
+_PROMPT_PREFIX = """Analyze the message below and determine if it's a scam or fraudulent attempt.
+
+Consider these scam indicators:
+1. Urgency tactics (immediate action required, account will be blocked)
+2. Request for sensitive information (UPI ID, bank details, OTP, passwords)
+3. Threats or fear tactics
+4. Too-good-to-be-true offers (prizes, lottery wins)
+5. Impersonation of banks, government, or official entities
+6. Suspicious links or payment requests
+7. Poor grammar or spelling (sometimes)
+8. Unsolicited contact
+
+Respond ONLY with a JSON object (no markdown):
+{
+  "is_scam": true/false,
+  "confidence": 0.0-1.0,
+  "scam_type": "bank_fraud/upi_fraud/phishing/fake_offer/other/none",
+  "reasoning": "brief explanation",
+  "key_indicators": ["indicator1", "indicator2"]
+}"""
+
 
 def extract_json_from_text(text: str) -> str:
     """Extract JSON object from text that may contain other content"""
@@ -39,6 +67,8 @@ class ScamDetector:
         self.gemini_clients = []  # Multiple Gemini clients for key rotation
         self.detection_cache = {}  # In-memory cache for faster repeated detections
         self.cache_max_size = settings.CACHE_MAX_SIZE  # Dynamic cache size
+        self._inflight: Dict[str, asyncio.Future] = {}  # Detections currently running, keyed by cache key
+        self._lock = threading.Lock()  # Guards detection_cache and Gemini key rotation across worker threads
         
         # Initialize all available providers dynamically
         self._initialize_providers()
@@ -49,12 +79,14 @@ class ScamDetector:
     
     def _add_to_cache(self, message: str, result: dict):
         """Add detection result to cache"""
-        if len(self.detection_cache) >= self.cache_max_size:
-            # Remove oldest entry (simple FIFO)
-            self.detection_cache.pop(next(iter(self.detection_cache)))
-        
         cache_key = self._get_cache_key(message)
-        self.detection_cache[cache_key] = result
+        with self._lock:
+            if len(self.detection_cache) >= self.cache_max_size:
+                # Remove oldest entry (simple FIFO)
+                self.detection_cache.pop(next(iter(self.detection_cache)), None)
+            
+            # Store a copy so no caller holds a reference to the cached dict
+            self.detection_cache[cache_key] = result.copy()
         logger.debug(f"Cached detection result for message: {message[:50]}...")
     
     def _initialize_providers(self):
@@ -62,6 +94,7 @@ class ScamDetector:
         # Try Anthropic (Claude Haiku 4.5) - Primary
         try:
             if settings.ANTHROPIC_API_KEY and settings.ANTHROPIC_API_KEY != "your-anthropic-api-key-here":
+                from anthropic import Anthropic  # Imported on demand: the SDK is slow to import
                 self.clients['anthropic'] = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
                 self.models['anthropic'] = settings.ANTHROPIC_MODEL
                 self.available_providers.append('anthropic')
@@ -73,6 +106,7 @@ class ScamDetector:
         try:
             gemini_keys = settings.get_gemini_api_keys()
             if gemini_keys:
+                from google import genai  # Imported on demand: the SDK is slow to import
                 for idx, api_key in enumerate(gemini_keys):
                     try:
                         client = genai.Client(api_key=api_key)
@@ -94,17 +128,21 @@ class ScamDetector:
         else:
             logger.info(f"✅ Available providers: {', '.join(self.available_providers)}")
     
-    def _call_llm(self, provider: str, prompt: str) -> str:
-        """Call LLM (Claude Haiku 4.5 or Gemini) with error handling - optimized for speed"""
+    def _call_llm(self, provider: str, prompt: str, prefix: Optional[str] = None) -> str:
+        """Call LLM (Claude Haiku 4.5 or Gemini) with error handling - optimized for speed
+        
+        prefix: static prompt part sent ahead of prompt (too short for Claude's prompt cache)
+        """
         try:
             if provider == "anthropic":
                 # Claude Haiku 4.5 - Ultra fast and cost-effective
+                content = prefix + prompt if prefix else prompt
                 response = self.clients['anthropic'].messages.create(
                     model=self.models['anthropic'],
                     max_tokens=settings.LLM_MAX_TOKENS_DETECTION,
                     temperature=settings.LLM_TEMPERATURE_DETECTION,
                     messages=[
-                        {"role": "user", "content": prompt}
+                        {"role": "user", "content": content}
                     ]
                 )
                 
@@ -114,6 +152,8 @@ class ScamDetector:
                 return result_text
             
             elif provider == "gemini":
+                contents = prefix + prompt if prefix else prompt
+                
                 # Prioritize Flash models for speed, then fallback to Pro for quality
                 gemini_models = [
                     'models/gemini-2.5-flash',      # Fastest
@@ -126,7 +166,8 @@ class ScamDetector:
                 
                 # Try each Gemini client (rotating through API keys on quota errors)
                 for client_attempt in range(len(self.gemini_clients)):
-                    current_client = self.gemini_clients[self.gemini_key_index]
+                    key_index = self.gemini_key_index
+                    current_client = self.gemini_clients[key_index]
                     
                     last_error = None
                     for model_name in gemini_models:
@@ -134,7 +175,7 @@ class ScamDetector:
                             # Use proper generation configuration
                             response = current_client.models.generate_content(
                                 model=model_name,
-                                contents=prompt,
+                                contents=contents,
                                 config={
                                     'temperature': settings.LLM_TEMPERATURE_DETECTION,
                                     'maxOutputTokens': settings.LLM_MAX_TOKENS_DETECTION,
@@ -149,7 +190,7 @@ class ScamDetector:
                                 if hasattr(candidate, 'finish_reason'):
                                     logger.info(f"Finish reason: {candidate.finish_reason}")
                             
-                            logger.info(f"Scam Detector: Successfully used Gemini model: {model_name} (key {self.gemini_key_index + 1})")
+                            logger.info(f"Scam Detector: Successfully used Gemini model: {model_name} (key {key_index + 1})")
                             
                             # Extract text from response - try different methods
                             result_text = ""
@@ -179,7 +220,7 @@ class ScamDetector:
                             
                             # Check if it's a quota error - if so, try next model with current key
                             if "429" in error_msg or "resource_exhausted" in error_msg or "quota" in error_msg:
-                                logger.warning(f"Scam Detector: Gemini model {model_name} quota exceeded (key {self.gemini_key_index + 1})")
+                                logger.warning(f"Scam Detector: Gemini model {model_name} quota exceeded (key {key_index + 1})")
                                 continue
                             else:
                                 logger.warning(f"Scam Detector: Gemini model {model_name} failed: {model_error}")
@@ -187,7 +228,10 @@ class ScamDetector:
                     
                     # All models failed with current key, try rotating to next key
                     if len(self.gemini_clients) > 1 and client_attempt < len(self.gemini_clients) - 1:
-                        self.gemini_key_index = (self.gemini_key_index + 1) % len(self.gemini_clients)
+                        with self._lock:
+                            # Only rotate if no other thread has moved off this key already
+                            if self.gemini_key_index == key_index:
+                                self.gemini_key_index = (key_index + 1) % len(self.gemini_clients)
                         logger.warning(f"Scam Detector: Rotating to Gemini API key {self.gemini_key_index + 1}")
                         continue
                     else:
@@ -201,6 +245,46 @@ class ScamDetector:
             logger.error(f"Error calling {provider}: {e}")
             raise
     
+    async def adetect_scam(self, message: str, conversation_history: List[Message] = None) -> dict:
+        """
+        Async detect_scam that runs off the event loop and coalesces identical
+        in-flight messages, so a burst of duplicates triggers a single detection
+        """
+        cache_key = self._get_cache_key(message)
+        if cache_key in self.detection_cache:
+            return self.detect_scam(message, conversation_history)
+        
+        # Another request is already detecting this message - share its result
+        fut = self._inflight.get(cache_key)
+        if fut is not None:
+            logger.info("Joining in-flight detection for identical message")
+            try:
+                # Shielded so a cancelled joiner never cancels the detection others are waiting on
+                return (await asyncio.shield(fut)).copy()
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise  # This request itself was cancelled
+                # The leading request was cancelled before finishing - detect independently
+                logger.info("In-flight detection was cancelled - detecting independently")
+                return await asyncio.to_thread(self.detect_scam, message, conversation_history)
+        
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = fut
+        try:
+            result = await asyncio.to_thread(self.detect_scam, message, conversation_history)
+            fut.set_result(result)
+            return result.copy()
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # Mark retrieved so an unawaited future doesn't log a warning
+            raise
+        finally:
+            # Resolve the future even when cancelled (CancelledError skips the handler above),
+            # so coalesced waiters never hang on it
+            if not fut.done():
+                fut.cancel()
+            del self._inflight[cache_key]
+    
     def detect_scam(self, message: str, conversation_history: List[Message] = None) -> dict:
         """
         Detect if a message is a scam with caching for performance
@@ -214,48 +298,40 @@ class ScamDetector:
         
         # Check cache first for faster response
         cache_key = self._get_cache_key(message)
-        if cache_key in self.detection_cache:
+        with self._lock:
+            cached_result = self.detection_cache.get(cache_key)
+            if cached_result is not None:
+                cached_result = cached_result.copy()
+        if cached_result is not None:
             logger.info(f"Cache hit for message detection")
-            cached_result = self.detection_cache[cache_key].copy()
             cached_result['reasoning'] = cached_result.get('reasoning', '') + ' [cached]'
             return cached_result
         
+        # Fast path: cheap keyword pre-screen settles obvious scams without the LLM.
+        # Low scores still go to the LLM - a scam tripping a single keyword must not be waved through
+        pre = None
+        if settings.ENABLE_FAST_PATH:
+            pre = self._fallback_detection(message)
+            if pre['confidence'] >= settings.FAST_PATH_HIGH_CONFIDENCE:
+                logger.info(f"Fast-path detection (confidence={pre['confidence']:.2f}) - skipping LLM")
+                pre['reasoning'] += ' [fast-path]'
+                self._add_to_cache(message, pre)
+                return pre
+        
         # Build context from conversation history
         context = ""
         if conversation_history:
-            context = "Previous conversation:\n"
-            for msg in conversation_history[-5:]:  # Last 5 messages for context
-                context += f"{msg.sender}: {msg.text}\n"
+            context = "Previous conversation:\n" + "".join(
+                f"{msg.sender}: {msg.text}\n" for msg in conversation_history[-5:]  # Last 5 messages for context
+            )
+        
+        # Only the per-call suffix is built here; _PROMPT_PREFIX is sent unchanged
+        prompt = f'\n\n{context}\n\nCurrent message to analyze: "{message}"'
         
-        prompt = f"""Analyze the following message and determine if it's a scam or fraudulent attempt.
-
-{context}
-
-Current message to analyze: "{message}"
-
-Consider these scam indicators:
-1. Urgency tactics (immediate action required, account will be blocked)
-2. Request for sensitive information (UPI ID, bank details, OTP, passwords)
-3. Threats or fear tactics
-4. Too-good-to-be-true offers (prizes, lottery wins)
-5. Impersonation of banks, government, or official entities
-6. Suspicious links or payment requests
-7. Poor grammar or spelling (sometimes)
-8. Unsolicited contact
-
-Respond ONLY with a JSON object (no markdown):
-{{
-  "is_scam": true/false,
-  "confidence": 0.0-1.0,
-  "scam_type": "bank_fraud/upi_fraud/phishing/fake_offer/other/none",
-  "reasoning": "brief explanation",
-  "key_indicators": ["indicator1", "indicator2"]
-}}"""
-
         # Try LLM first (respects LLM_PROVIDER setting), fallback to keywords
         if not self.available_providers:
             logger.info("No LLM available - using keyword detection")
-            return self._fallback_detection(message)
+            return pre or self._fallback_detection(message)
         
         # Try primary provider first, then fallback to other available providers
         providers_to_try = []
@@ -270,7 +346,7 @@ Respond ONLY with a JSON object (no markdown):
         for provider in providers_to_try:
             try:
                 logger.info(f"Attempting scam detection with provider: {provider}")
-                result = self._call_llm(provider, prompt)
+                result = self._call_llm(provider, prompt, prefix=_PROMPT_PREFIX)
                 
                 # Log raw result details
                 logger.info(f"Received response length: {len(result)} characters")
@@ -308,7 +384,7 @@ Respond ONLY with a JSON object (no markdown):
         
         # All LLM providers failed - use keyword-based fallback
         logger.warning(f"All LLM providers failed (last error: {last_error}) - using keyword-based fallback")
-        fallback_result = self._fallback_detection(message)
+        fallback_result = pre or self._fallback_detection(message)
         
         # Cache fallback result too (for repeated messages)
         self._add_to_cache(message, fallback_result)
@@ -319,8 +395,6 @@ Respond ONLY with a JSON object (no markdown):
     
     def _fallback_detection(self, message: str) -> dict:
         """Enhanced keyword-based scam detection with intelligent type classification"""
-        import re
-        
         message_lower = message.lower()
         logger.info(f"🔍 ANALYZING MESSAGE: '{message[:100]}...'")
         
@@ -346,13 +420,13 @@ Respond ONLY with a JSON object (no markdown):
         
         logger.info(f"📊 KEYWORD SCORES: Bank={bank_score}, UPI={upi_score}, Phishing={phishing_score}, Lottery={lottery_score}, Urgency={urgency_score}, Threat={threat_score}, Sensitive={sensitive_score}")
         
-        # Check for URLs and links (strong phishing indicator)
-        has_url = bool(re.search(r'http[s]?://[^\s]+', message))
-        has_short_url = bool(re.search(r'\b(?:bit\.ly|tinyurl|goo\.gl|ow\.ly|short\.link|t\.co)/[a-zA-Z0-9\-_]+', message, re.IGNORECASE))
-        has_suspicious_link = bool(re.search(r'\b\w+\.\w+/\w+', message))
+        # Check for URLs and links (strong phishing indicator) - single lowered buffer for all scans
+        has_url = _URL_RE.search(message_lower) is not None
+        has_short_url = _SHORT_URL_RE.search(message_lower) is not None
+        has_suspicious_link = _SUSPICIOUS_LINK_RE.search(message_lower) is not None
         
         # Phone number patterns (Indian format)
-        has_phone = bool(re.search(r'(?:\+91|91)?[6-9]\d{9}', message))
+        has_phone = _INDIAN_PHONE_RE.search(message_lower) is not None
         
         if has_url or has_short_url or has_suspicious_link or has_phone:
             logger.info(f"🔗 PATTERNS FOUND: URL={has_url}, ShortURL={has_short_url}, SuspiciousLink={has_suspicious_link}, Phone={has_phone}")
@@ -1,20 +1,58 @@
 import re
-from typing import List, Set, Dict, Tuple
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import List, Set, Dict, Tuple, Optional, Iterator
 from datetime import datetime
 from src.models.schemas import ExtractedIntelligence, IntelligenceItem, Message
 
+# Sort key for intelligence items (C-level attribute access instead of a lambda)
+_CONFIDENCE_KEY = attrgetter('confidence')
+
+
+@dataclass
+class MessageContext:
+    """Keyword context of a single message, shared by all values extracted from it"""
+    message: str
+    message_lower: str
+    context_snippet: str
+    scam_keywords: List[str]
+    urgency_count: int  # Capped at KEYWORD_COUNT_CAP, where the confidence boost saturates
+    sensitive_count: int  # Capped at KEYWORD_COUNT_CAP, where the confidence boost saturates
+    base_boost: float  # Urgency + sensitive boost, the same for every value in the message
+    context_boosts: Dict[str, float]  # Value type -> boost from its context terms (0.0 if absent)
+
+
+@dataclass(slots=True)
+class TrackedItem:
+    """Cross-message tracking record of one extracted value"""
+    base_confidence: float
+    occurrences: int
+    firstSeen: str
+
 
 class IntelligenceExtractor:
     """Extracts structured intelligence with confidence weighting from conversations"""
     
-    # Regex patterns for extraction
-    BANK_ACCOUNT_PATTERN = r'\b\d{9,18}\b'
-    UPI_PATTERN = r'\b[\w\.-]+@[\w\.-]+\b'
-    PHONE_PATTERN = r'\+?\d{10,15}'
-    URL_PATTERN = r'https?://[^\s<>"{}|\\^`\[\]]+'
+    # Regex patterns for extraction (compiled once at import)
+    BANK_ACCOUNT_RE = re.compile(r'\b\d{9,18}\b')
+    PHONE_RE = re.compile(r'\+?\d{10,15}')
+    URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+    INDIAN_PHONE_RE = re.compile(r'^(?:\+?91)?([6-9]\d{9})$')  # Optional +91/91 country code
+    DIGIT_RUN_RE = re.compile(r'\d{9}')  # Shortest digit run a bank account or phone number can have
     
     # UPI provider patterns for validation
-    UPI_PROVIDERS = ['paytm', 'phonepe', 'gpay', 'okaxis', 'ybl', 'axl', 'ibl', 'okhdfcbank', 'oksbi', 'fbl', 'icici']
+    UPI_PROVIDERS = ('paytm', 'phonepe', 'gpay', 'okaxis', 'ybl', 'axl', 'ibl', 'okhdfcbank', 'oksbi', 'fbl', 'icici')
+    UPI_PROVIDER_RE = re.compile('|'.join(map(re.escape, UPI_PROVIDERS)), re.IGNORECASE)
+    # UPI handles whose part after '@' names a known provider (plain emails never match).
+    # Matching only starts at the beginning of a [\w.-] run, so long runs without '@'
+    # are scanned once instead of once per word boundary (quadratic backtracking).
+    UPI_RE = re.compile(
+        r'(?<![\w\.-])[\.-]*\b([\w\.-]+@(?=[\w\.-]*?(?:' + '|'.join(map(re.escape, UPI_PROVIDERS)) + r'))[\w\.-]+\b)',
+        re.IGNORECASE
+    )
+    
+    # Short-link domains and suspicious TLDs in phishing links
+    SUSPICIOUS_URL_RE = re.compile(r'\.tk|\.ml|bit\.ly|tinyurl|short', re.IGNORECASE)
     
     # Common scam keywords
     SCAM_KEYWORDS = [
@@ -31,154 +69,225 @@ class IntelligenceExtractor:
     # Sensitive data keywords that boost confidence
     SENSITIVE_KEYWORDS = ['otp', 'password', 'pin', 'cvv', 'account number']
     
+    # Urgency (0.1 each, max 0.2) and sensitive (0.15 each, max 0.25) boosts both saturate at 2 hits
+    KEYWORD_COUNT_CAP = 2
+    
+    # Context terms that boost confidence for a specific value type
+    BANK_TERMS = ['account', 'bank', 'transfer', 'ifsc']
+    PAYMENT_TERMS = ['upi', 'payment', 'pay', 'send', 'transfer']
+    CONTACT_TERMS = ['call', 'contact', 'whatsapp', 'number']
+    CLICK_TERMS = ['click', 'verify', 'confirm', 'update']
+    
+    # Messages shorter than the shortest keyword, or without any letter, cannot contain keywords
+    MIN_KEYWORD_LENGTH = min(map(len, SCAM_KEYWORDS + HIGH_URGENCY_KEYWORDS + SENSITIVE_KEYWORDS +
+                                 BANK_TERMS + PAYMENT_TERMS + CONTACT_TERMS + CLICK_TERMS))
+    LETTER_RE = re.compile(r'[a-z]')
+    
+    # Detailed item lists of ExtractedIntelligence, one per intelligence category
+    DETAILED_FIELDS = (
+        'bankAccountsDetailed', 'upiIdsDetailed', 'phoneNumbersDetailed',
+        'phishingLinksDetailed', 'suspiciousKeywordsDetailed'
+    )
+    
     def __init__(self):
         self.extracted_data = ExtractedIntelligence()
-        self.item_tracking: Dict[str, Dict] = {}  # Track items across messages for confidence boosting
+        self.item_tracking: Dict[Tuple[str, str], TrackedItem] = {}  # Track items across messages for confidence boosting
     
-    def _calculate_context_confidence(self, message: str, extracted_value: str, value_type: str) -> Tuple[float, str]:
-        """Calculate confidence score based on context around extracted value"""
+    @staticmethod
+    def _count_keywords(keywords: List[str], message_lower: str, cap: int) -> int:
+        """Count keywords present in the message, stopping as soon as the cap is reached"""
+        count = 0
+        for kw in keywords:
+            if kw in message_lower:
+                count += 1
+                if count >= cap:
+                    break
+        return count
+    
+    def _build_context(self, message: str) -> MessageContext:
+        """Scan a message for context keywords once, for reuse by every extracted value"""
         message_lower = message.lower()
-        context_snippet = message[:100]  # First 100 chars as context
-        base_confidence = 0.5
-        confidence_boost = 0.0
         
-        # Boost confidence if urgency keywords present
-        urgency_count = sum(1 for kw in self.HIGH_URGENCY_KEYWORDS if kw in message_lower)
-        confidence_boost += min(urgency_count * 0.1, 0.2)
+        # Fast path: acknowledgements, OTP digits and the like skip every keyword scan
+        if len(message_lower) < self.MIN_KEYWORD_LENGTH or not self.LETTER_RE.search(message_lower):
+            return MessageContext(
+                message=message,
+                message_lower=message_lower,
+                context_snippet=message[:100],
+                scam_keywords=[],
+                urgency_count=0,
+                sensitive_count=0,
+                base_boost=0.0,
+                context_boosts={}
+            )
+        
+        urgency_count = self._count_keywords(self.HIGH_URGENCY_KEYWORDS, message_lower, self.KEYWORD_COUNT_CAP)
+        sensitive_count = self._count_keywords(self.SENSITIVE_KEYWORDS, message_lower, self.KEYWORD_COUNT_CAP)
+        return MessageContext(
+            message=message,
+            message_lower=message_lower,
+            context_snippet=message[:100],  # First 100 chars as context
+            scam_keywords=[kw for kw in self.SCAM_KEYWORDS if kw in message_lower],
+            urgency_count=urgency_count,
+            sensitive_count=sensitive_count,
+            base_boost=min(urgency_count * 0.1, 0.2) + min(sensitive_count * 0.15, 0.25),
+            context_boosts={
+                'bank_account': 0.2 if any(term in message_lower for term in self.BANK_TERMS) else 0.0,
+                'upi_id': 0.15 if any(term in message_lower for term in self.PAYMENT_TERMS) else 0.0,
+                'phone_number': 0.1 if any(term in message_lower for term in self.CONTACT_TERMS) else 0.0,
+                'phishing_link': 0.15 if any(term in message_lower for term in self.CLICK_TERMS) else 0.0,
+            }
+        )
+    
+    def _calculate_context_confidence(self, message: str, extracted_value: str, value_type: str,
+                                      ctx: Optional[MessageContext] = None) -> Tuple[float, str]:
+        """Calculate confidence score based on context around extracted value"""
+        if ctx is None:
+            ctx = self._build_context(message)
+        base_confidence = 0.5
         
-        # Boost confidence if sensitive keywords present
-        sensitive_count = sum(1 for kw in self.SENSITIVE_KEYWORDS if kw in message_lower)
-        confidence_boost += min(sensitive_count * 0.15, 0.25)
+        # Urgency and sensitive keyword boosts are precomputed per message
+        confidence_boost = ctx.base_boost
         
-        # Type-specific confidence adjustments
+        # Value-specific confidence adjustments
         if value_type == 'bank_account':
             # Longer account numbers are more likely valid
             if len(extracted_value) >= 12:
                 confidence_boost += 0.15
-            # Check if mentioned with bank-related terms
-            if any(term in message_lower for term in ['account', 'bank', 'transfer', 'ifsc']):
-                confidence_boost += 0.2
         
         elif value_type == 'upi_id':
             # Check if valid UPI provider
-            has_valid_provider = any(provider in extracted_value.lower() for provider in self.UPI_PROVIDERS)
-            if has_valid_provider:
+            if self.UPI_PROVIDER_RE.search(extracted_value):
                 confidence_boost += 0.3
-            # Check for payment context
-            if any(term in message_lower for term in ['upi', 'payment', 'pay', 'send', 'transfer']):
-                confidence_boost += 0.15
         
         elif value_type == 'phone_number':
             # Indian phone numbers (10 digits starting with 6-9)
-            if re.match(r'^[6-9]\d{9}$', extracted_value.replace('+91', '').replace('91', '')):
+            if self.INDIAN_PHONE_RE.match(extracted_value):
                 confidence_boost += 0.2
-            # Check for contact context
-            if any(term in message_lower for term in ['call', 'contact', 'whatsapp', 'number']):
-                confidence_boost += 0.1
         
         elif value_type == 'phishing_link':
             # HTTPS is more suspicious (legitimate appearance)
             if extracted_value.startswith('https'):
                 confidence_boost += 0.15
             # Short domains or suspicious TLDs
-            if any(indicator in extracted_value.lower() for indicator in ['.tk', '.ml', 'bit.ly', 'tinyurl', 'short']):
+            if self.SUSPICIOUS_URL_RE.search(extracted_value):
                 confidence_boost += 0.25
-            # Click urgency
-            if any(term in message_lower for term in ['click', 'verify', 'confirm', 'update']):
-                confidence_boost += 0.15
         
         elif value_type == 'keyword':
             # Keywords in ALL CAPS get higher confidence
             if extracted_value.upper() in message:
                 confidence_boost += 0.15
-            # Repeated keywords
-            count = message_lower.count(extracted_value.lower())
+            # Repeated keywords (keyword values are the already-lowercase SCAM_KEYWORDS entries)
+            count = ctx.message_lower.count(extracted_value)
             if count > 1:
                 confidence_boost += min(count * 0.05, 0.15)
         
+        # Context terms for the value type (bank terms, payment, contact, click urgency)
+        confidence_boost += ctx.context_boosts.get(value_type, 0.0)
+        
         final_confidence = min(base_confidence + confidence_boost, 1.0)
-        return final_confidence, context_snippet
+        return final_confidence, ctx.context_snippet
     
     def _track_and_update_item(self, value: str, value_type: str, confidence: float, context: str) -> IntelligenceItem:
         """Track item across messages and boost confidence for repeated occurrences"""
-        key = f"{value_type}:{value}"
+        key = (value_type, value)
+        tracked = self.item_tracking.get(key)
         
-        if key in self.item_tracking:
+        if tracked is not None:
             # Item seen before - boost confidence
-            tracked = self.item_tracking[key]
-            tracked['occurrences'] += 1
+            tracked.occurrences += 1
             # Confidence boost for repetition (max +0.2)
-            repetition_boost = min(tracked['occurrences'] * 0.05, 0.2)
-            boosted_confidence = min(tracked['base_confidence'] + repetition_boost, 1.0)
+            repetition_boost = min(tracked.occurrences * 0.05, 0.2)
+            boosted_confidence = min(tracked.base_confidence + repetition_boost, 1.0)
             
             return IntelligenceItem(
                 value=value,
                 confidence=boosted_confidence,
                 context=context,
-                firstSeen=tracked['firstSeen'],
-                occurrences=tracked['occurrences']
+                firstSeen=tracked.firstSeen,
+                occurrences=tracked.occurrences
             )
         else:
-            # First time seeing this item
-            self.item_tracking[key] = {
-                'base_confidence': confidence,
-                'occurrences': 1,
-                'firstSeen': datetime.now().isoformat()
-            }
+            # First time seeing this item - one timestamp for both tracking and the item
+            now_iso = datetime.now().isoformat()
+            self.item_tracking[key] = TrackedItem(
+                base_confidence=confidence,
+                occurrences=1,
+                firstSeen=now_iso
+            )
             
             return IntelligenceItem(
                 value=value,
                 confidence=confidence,
                 context=context,
-                firstSeen=datetime.now().isoformat(),
+                firstSeen=now_iso,
                 occurrences=1
             )
     
+    @staticmethod
+    def _unique_matches(pattern: re.Pattern, message: str, group: int = 0) -> Iterator[str]:
+        """Yield each distinct match of a pattern once, in order of first appearance"""
+        seen: Set[str] = set()
+        for match in pattern.finditer(message):
+            value = match.group(group)
+            if value not in seen:
+                seen.add(value)
+                yield value
+    
     def extract_from_message(self, message: str) -> ExtractedIntelligence:
         """Extract intelligence with confidence weighting from a single message"""
+        intel = self._extract_detailed(message)
+        
+        # Sync detailed items to simple lists for GUVI compatibility
+        intel.sync_from_detailed()
+        
+        return intel
+    
+    def _extract_detailed(self, message: str) -> ExtractedIntelligence:
+        """Extract only the detailed items of a message (simple lists are left unsynced)"""
         intel = ExtractedIntelligence()
         
+        # Keyword context is computed once per message and shared by every confidence score
+        ctx = self._build_context(message)
+        
+        # One cheap pre-scan decides which full scans can possibly match
+        has_digit_run = self.DIGIT_RUN_RE.search(message) is not None
+        
         # Extract bank accounts with confidence
-        bank_accounts = re.findall(self.BANK_ACCOUNT_PATTERN, message)
-        for account in set(bank_accounts):
-            confidence, context = self._calculate_context_confidence(message, account, 'bank_account')
+        bank_accounts = self._unique_matches(self.BANK_ACCOUNT_RE, message) if has_digit_run else ()
+        for account in bank_accounts:
+            confidence, context = self._calculate_context_confidence(message, account, 'bank_account', ctx)
             item = self._track_and_update_item(account, 'bank_account', confidence, context)
             intel.bankAccountsDetailed.append(item)
         
         # Extract UPI IDs with confidence
-        upi_ids = re.findall(self.UPI_PATTERN, message)
-        # Filter out email-like patterns that aren't UPI
-        valid_upi_ids = [uid for uid in upi_ids if any(provider in uid.lower() for provider in self.UPI_PROVIDERS)]
-        for upi_id in set(valid_upi_ids):
-            confidence, context = self._calculate_context_confidence(message, upi_id, 'upi_id')
+        upi_ids = self._unique_matches(self.UPI_RE, message, 1) if '@' in message else ()
+        for upi_id in upi_ids:
+            confidence, context = self._calculate_context_confidence(message, upi_id, 'upi_id', ctx)
             item = self._track_and_update_item(upi_id, 'upi_id', confidence, context)
             intel.upiIdsDetailed.append(item)
         
         # Extract phone numbers with confidence
-        phone_numbers = re.findall(self.PHONE_PATTERN, message)
-        for phone in set(phone_numbers):
-            confidence, context = self._calculate_context_confidence(message, phone, 'phone_number')
+        phone_numbers = self._unique_matches(self.PHONE_RE, message) if has_digit_run else ()
+        for phone in phone_numbers:
+            confidence, context = self._calculate_context_confidence(message, phone, 'phone_number', ctx)
             item = self._track_and_update_item(phone, 'phone_number', confidence, context)
             intel.phoneNumbersDetailed.append(item)
         
         # Extract URLs with confidence
-        urls = re.findall(self.URL_PATTERN, message)
-        for url in set(urls):
-            confidence, context = self._calculate_context_confidence(message, url, 'phishing_link')
+        urls = self._unique_matches(self.URL_RE, message) if '://' in message else ()
+        for url in urls:
+            confidence, context = self._calculate_context_confidence(message, url, 'phishing_link', ctx)
             item = self._track_and_update_item(url, 'phishing_link', confidence, context)
             intel.phishingLinksDetailed.append(item)
         
         # Extract suspicious keywords with confidence
-        message_lower = message.lower()
-        found_keywords = [kw for kw in self.SCAM_KEYWORDS if kw in message_lower]
-        for keyword in set(found_keywords):
-            confidence, context = self._calculate_context_confidence(message, keyword, 'keyword')
+        # SCAM_KEYWORDS has no duplicates, so the hits are already unique
+        for keyword in ctx.scam_keywords:
+            confidence, context = self._calculate_context_confidence(message, keyword, 'keyword', ctx)
             item = self._track_and_update_item(keyword, 'keyword', confidence, context)
             intel.suspiciousKeywordsDetailed.append(item)
         
-        # Sync detailed items to simple lists for GUVI compatibility
-        intel.sync_from_detailed()
-        
         return intel
     
     def extract_from_conversation(self, messages: List[Message]) -> ExtractedIntelligence:
@@ -188,43 +297,27 @@ class IntelligenceExtractor:
         # Reset tracking for new extraction
         self.item_tracking.clear()
         
+        # Aggregate straight into per-category buckets keyed by value (highest confidence wins)
+        buckets: Dict[str, Dict[str, IntelligenceItem]] = {name: {} for name in self.DETAILED_FIELDS}
         for msg in messages:
             if msg.sender == "scammer":
-                intel = self.extract_from_message(msg.text)
-                
-                # Merge detailed items (tracking handles deduplication and confidence boosting)
-                all_intel.bankAccountsDetailed.extend(intel.bankAccountsDetailed)
-                all_intel.upiIdsDetailed.extend(intel.upiIdsDetailed)
-                all_intel.phoneNumbersDetailed.extend(intel.phoneNumbersDetailed)
-                all_intel.phishingLinksDetailed.extend(intel.phishingLinksDetailed)
-                all_intel.suspiciousKeywordsDetailed.extend(intel.suspiciousKeywordsDetailed)
-        
-        # Deduplicate detailed items by value (keep highest confidence)
-        all_intel.bankAccountsDetailed = self._deduplicate_items(all_intel.bankAccountsDetailed)
-        all_intel.upiIdsDetailed = self._deduplicate_items(all_intel.upiIdsDetailed)
-        all_intel.phoneNumbersDetailed = self._deduplicate_items(all_intel.phoneNumbersDetailed)
-        all_intel.phishingLinksDetailed = self._deduplicate_items(all_intel.phishingLinksDetailed)
-        all_intel.suspiciousKeywordsDetailed = self._deduplicate_items(all_intel.suspiciousKeywordsDetailed)
+                # Per-message simple lists are never read here, so skip syncing them
+                intel = self._extract_detailed(msg.text)
+                for name, bucket in buckets.items():
+                    for item in getattr(intel, name):
+                        current = bucket.get(item.value)
+                        if current is None or item.confidence > current.confidence:
+                            bucket[item.value] = item
+        
+        # Materialize each category once, sorted by confidence (highest first)
+        for name, bucket in buckets.items():
+            setattr(all_intel, name, sorted(bucket.values(), key=_CONFIDENCE_KEY, reverse=True))
         
         # Sync to simple lists for GUVI compatibility
         all_intel.sync_from_detailed()
         
         return all_intel
     
-    def _deduplicate_items(self, items: List[IntelligenceItem]) -> List[IntelligenceItem]:
-        """Deduplicate items, keeping the one with highest confidence"""
-        if not items:
-            return []
-        
-        # Group by value
-        grouped: Dict[str, IntelligenceItem] = {}
-        for item in items:
-            if item.value not in grouped or item.confidence > grouped[item.value].confidence:
-                grouped[item.value] = item
-        
-        # Sort by confidence (highest first)
-        return sorted(grouped.values(), key=lambda x: x.confidence, reverse=True)
-    
     def merge_intelligence(self, existing: ExtractedIntelligence, new: ExtractedIntelligence) -> ExtractedIntelligence:
         """Merge two intelligence objects with confidence preservation"""
         merged = ExtractedIntelligence()
@@ -253,18 +346,20 @@ class IntelligenceExtractor:
     
     def _merge_detailed_items(self, existing: List[IntelligenceItem], new: List[IntelligenceItem]) -> List[IntelligenceItem]:
         """Merge two lists of intelligence items, updating confidence for duplicates"""
-        # Create lookup by value
-        merged_dict: Dict[str, IntelligenceItem] = {}
+        # Fast path: one side empty - nothing to combine. Both sides are already unique
+        # per value, and the existing list is sorted when it came from a previous merge,
+        # which Timsort confirms in a single linear pass.
+        if not new or not existing:
+            return sorted(existing or new, key=_CONFIDENCE_KEY, reverse=True)
         
-        # Add existing items
-        for item in existing:
-            merged_dict[item.value] = item
+        # Create lookup by value from existing items
+        merged_dict: Dict[str, IntelligenceItem] = {item.value: item for item in existing}
         
         # Merge new items
         for item in new:
-            if item.value in merged_dict:
+            existing_item = merged_dict.get(item.value)
+            if existing_item is not None:
                 # Item exists - combine occurrences and take max confidence
-                existing_item = merged_dict[item.value]
                 merged_dict[item.value] = IntelligenceItem(
                     value=item.value,
                     confidence=max(existing_item.confidence, item.confidence),
@@ -277,4 +372,4 @@ class IntelligenceExtractor:
                 merged_dict[item.value] = item
         
         # Return sorted by confidence
-        return sorted(merged_dict.values(), key=lambda x: x.confidence, reverse=True)
+        return sorted(merged_dict.values(), key=_CONFIDENCE_KEY, reverse=True)
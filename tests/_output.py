@@ -0,0 +1,39 @@
+"""Per-thread output capture for scripts that run their checks concurrently"""
+import io
+import sys
+import threading
+from contextlib import contextmanager
+
+
+class PerThreadStdout:
+    """sys.stdout proxy that routes a capturing thread's prints into its own buffer"""
+    
+    def __init__(self, real):
+        self._real = real
+        self._local = threading.local()
+    
+    def write(self, text):
+        return getattr(self._local, 'buf', self._real).write(text)
+    
+    def flush(self):
+        self._real.flush()
+    
+    def run_captured(self, fn, *args, **kwargs):
+        """Run fn with this thread's output buffered; returns (result, output)"""
+        self._local.buf = io.StringIO()
+        try:
+            return fn(*args, **kwargs), self._local.buf.getvalue()
+        finally:
+            del self._local.buf
+
+
+@contextmanager
+def per_thread_stdout():
+    """Install a PerThreadStdout as sys.stdout for the duration of the block"""
+    real = sys.stdout
+    proxy = PerThreadStdout(real)
+    sys.stdout = proxy
+    try:
+        yield proxy
+    finally:
+        sys.stdout = real
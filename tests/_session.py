@@ -0,0 +1,8 @@
+"""Shared HTTP session for the standalone endpoint probe scripts"""
+import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive pool per process, so scripts run together reuse connections (and TLS)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=10))
@@ -1,7 +1,17 @@
-import requests
+import asyncio
+import httpx
 import json
 from datetime import datetime
 
+# One reusable compact encoder (json.dumps with custom options builds a new encoder per call)
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _buffered():
+    """Line buffer for one scenario's output (scenarios run concurrently, so print once at the end)"""
+    lines = []
+    return lines, lambda *args: lines.append(" ".join(map(str, args)))
+
 
 class HoneypotTester:
     """Test client for the Honeypot API"""
@@ -13,92 +23,120 @@ class HoneypotTester:
             "x-api-key": api_key,
             "Content-Type": "application/json"
         }
+        
+        # Shared async client, created in open() (one keep-alive pool for every scenario)
+        self._client: httpx.AsyncClient = None
+        
+        # Static request metadata, built once
+        self._metadata = {
+            "channel": "SMS",
+            "language": "English",
+            "locale": "IN"
+        }
+        self._empty_history = ()  # Immutable, so it can be shared by every request (encodes as [])
+        self._message_url = f"{base_url}/api/message"
     
-    def send_message(self, session_id: str, message: str, sender: str = "scammer", conversation_history: list = None):
+    async def open(self):
+        """Create the shared HTTP client"""
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+        )
+    
+    async def close(self):
+        """Close the shared HTTP client"""
+        await self._client.aclose()
+    
+    async def send_message(self, session_id: str, message: str, sender: str = "scammer", conversation_history: list = None,
+                           timestamp: str = None):
         """Send a message to the API"""
         payload = {
             "sessionId": session_id,
             "message": {
                 "sender": sender,
                 "text": message,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp or datetime.now().isoformat()
             },
-            "conversationHistory": conversation_history or [],
-            "metadata": {
-                "channel": "SMS",
-                "language": "English",
-                "locale": "IN"
-            }
+            "conversationHistory": conversation_history if conversation_history is not None else self._empty_history,
+            "metadata": self._metadata
         }
         
-        response = requests.post(
-            f"{self.base_url}/api/message",
-            headers=self.headers,
-            json=payload
+        response = await self._client.post(
+            self._message_url,
+            content=_encode(payload).encode()
         )
         
         return response.json()
     
-    def test_bank_fraud_scenario(self):
+    async def test_bank_fraud_scenario(self):
         """Test a typical bank fraud scam scenario"""
-        print("\n=== Testing Bank Fraud Scenario ===\n")
+        lines, out = _buffered()
+        
+        out("\n=== Testing Bank Fraud Scenario ===\n")
         
         session_id = "test-bank-fraud-001"
         
         # Message 1: Initial scam message
-        print("Scammer: Your bank account will be blocked today. Verify immediately.")
-        response = self.send_message(
+        out("Scammer: Your bank account will be blocked today. Verify immediately.")
+        response = await self.send_message(
             session_id=session_id,
             message="Your bank account will be blocked today. Verify immediately."
         )
-        print(f"Agent Response: {response.get('agentResponse')}")
-        print(f"Scam Detected: {response.get('scamDetected')}\n")
+        out(f"Agent Response: {response.get('agentResponse')}")
+        out(f"Scam Detected: {response.get('scamDetected')}\n")
         
         # Message 2: Follow-up
         if response.get('agentResponse'):
-            print(f"Scammer: Share your UPI ID to avoid account suspension.")
-            response = self.send_message(
+            out(f"Scammer: Share your UPI ID to avoid account suspension.")
+            response = await self.send_message(
                 session_id=session_id,
                 message="Share your UPI ID to avoid account suspension."
             )
-            print(f"Agent Response: {response.get('agentResponse')}")
-            print(f"Intelligence: {response.get('extractedIntelligence')}\n")
+            out(f"Agent Response: {response.get('agentResponse')}")
+            out(f"Intelligence: {response.get('extractedIntelligence')}\n")
         
         # Message 3: Provide fake details
         if response.get('agentResponse'):
-            print(f"Scammer: Send money to this UPI: scammer123@paytm to verify your account.")
-            response = self.send_message(
+            out(f"Scammer: Send money to this UPI: scammer123@paytm to verify your account.")
+            response = await self.send_message(
                 session_id=session_id,
                 message="Send money to this UPI: scammer123@paytm to verify your account."
             )
-            print(f"Agent Response: {response.get('agentResponse')}")
-            print(f"Intelligence: {response.get('extractedIntelligence')}\n")
+            out(f"Agent Response: {response.get('agentResponse')}")
+            out(f"Intelligence: {response.get('extractedIntelligence')}\n")
         
-        print(f"Session Complete: {response.get('sessionComplete')}")
-        print(f"Final Notes: {response.get('agentNotes')}")
+        out(f"Session Complete: {response.get('sessionComplete')}")
+        out(f"Final Notes: {response.get('agentNotes')}")
         
+        print("\n".join(lines))
         return response
     
-    def test_phishing_scenario(self):
+    async def test_phishing_scenario(self):
         """Test a phishing link scenario"""
-        print("\n=== Testing Phishing Scenario ===\n")
+        lines, out = _buffered()
+        
+        out("\n=== Testing Phishing Scenario ===\n")
         
         session_id = "test-phishing-001"
         
-        print("Scammer: Congratulations! You won ₹50,000. Click here to claim: http://fake-bank-site.com/claim")
-        response = self.send_message(
+        out("Scammer: Congratulations! You won ₹50,000. Click here to claim: http://fake-bank-site.com/claim")
+        response = await self.send_message(
             session_id=session_id,
             message="Congratulations! You won ₹50,000. Click here to claim: http://fake-bank-site.com/claim"
         )
-        print(f"Agent Response: {response.get('agentResponse')}")
-        print(f"Scam Detected: {response.get('scamDetected')}")
-        print(f"Intelligence: {response.get('extractedIntelligence')}\n")
+        out(f"Agent Response: {response.get('agentResponse')}")
+        out(f"Scam Detected: {response.get('scamDetected')}")
+        out(f"Intelligence: {response.get('extractedIntelligence')}\n")
         
+        print("\n".join(lines))
         return response
     
-    def test_multi_turn_conversation(self):
+    async def test_multi_turn_conversation(self):
         """Test a longer multi-turn conversation"""
-        print("\n=== Testing Multi-Turn Conversation ===\n")
+        lines, out = _buffered()
+        
+        out("\n=== Testing Multi-Turn Conversation ===\n")
         
         session_id = "test-multi-turn-001"
         conversation_history = []
@@ -112,48 +150,52 @@ class HoneypotTester:
         ]
         
         for i, msg in enumerate(messages, 1):
-            print(f"\nMessage {i}")
-            print(f"Scammer: {msg}")
+            out(f"\nMessage {i}")
+            out(f"Scammer: {msg}")
             
-            response = self.send_message(
+            # One timestamp per turn, shared by the request and both history entries
+            ts = datetime.now().isoformat()
+            response = await self.send_message(
                 session_id=session_id,
                 message=msg,
-                conversation_history=conversation_history
+                conversation_history=conversation_history,
+                timestamp=ts
             )
             
             agent_response = response.get('agentResponse')
-            print(f"Agent: {agent_response}")
+            out(f"Agent: {agent_response}")
             
             # Update conversation history
             conversation_history.append({
                 "sender": "scammer",
                 "text": msg,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": ts
             })
             
             if agent_response:
                 conversation_history.append({
                     "sender": "user",
                     "text": agent_response,
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": ts
                 })
             
-            print(f"Intelligence: {response.get('extractedIntelligence')}")
+            out(f"Intelligence: {response.get('extractedIntelligence')}")
             
             if response.get('sessionComplete'):
-                print("\n=== Session Completed ===")
+                out("\n=== Session Completed ===")
                 break
         
-        print(f"\nFinal Intelligence Extracted:")
-        print(json.dumps(response.get('extractedIntelligence'), indent=2))
-        print(f"\nAgent Notes: {response.get('agentNotes')}")
+        out(f"\nFinal Intelligence Extracted:")
+        out(json.dumps(response.get('extractedIntelligence'), indent=2))
+        out(f"\nAgent Notes: {response.get('agentNotes')}")
         
+        print("\n".join(lines))
         return response
     
-    def health_check(self):
+    async def health_check(self):
         """Check if API is running"""
         try:
-            response = requests.get(f"{self.base_url}/health")
+            response = await self._client.get(f"{self.base_url}/health")
             print(f"Health Check: {response.json()}")
             return response.status_code == 200
         except Exception as e:
@@ -161,29 +203,35 @@ class HoneypotTester:
             return False
 
 
-if __name__ == "__main__":
+async def main():
     # Initialize tester
     tester = HoneypotTester()
+    await tester.open()
     
-    # Check health
-    if not tester.health_check():
-        print("API is not running! Start the server first.")
-        exit(1)
-    
-    # Run tests
-    print("\n" + "="*60)
-    print("AI AGENTIC HONEYPOT - TEST SUITE")
-    print("="*60)
-    
-    # Test 1: Bank fraud
-    tester.test_bank_fraud_scenario()
-    
-    # Test 2: Phishing
-    tester.test_phishing_scenario()
-    
-    # Test 3: Multi-turn conversation
-    tester.test_multi_turn_conversation()
-    
-    print("\n" + "="*60)
-    print("TESTING COMPLETE")
-    print("="*60)
+    try:
+        # Check health
+        if not await tester.health_check():
+            print("API is not running! Start the server first.")
+            exit(1)
+        
+        # Run tests
+        print("\n" + "="*60)
+        print("AI AGENTIC HONEYPOT - TEST SUITE")
+        print("="*60)
+        
+        # Independent sessions run concurrently; the multi-turn turns stay serial inside their scenario
+        await asyncio.gather(
+            tester.test_bank_fraud_scenario(),   # Test 1: Bank fraud
+            tester.test_phishing_scenario(),     # Test 2: Phishing
+            tester.test_multi_turn_conversation()  # Test 3: Multi-turn conversation
+        )
+        
+        print("\n" + "="*60)
+        print("TESTING COMPLETE")
+        print("="*60)
+    finally:
+        await tester.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
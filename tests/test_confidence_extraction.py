@@ -3,9 +3,16 @@ Test Confidence-Weighted Intelligence Extraction
 Demonstrates the enhanced extraction with confidence scoring
 """
 
-import requests
+import asyncio
+import httpx
 import json
-import time
+import sys
+from operator import itemgetter
+
+try:
+    import pytest  # Only needed when the file is collected by pytest
+except ImportError:
+    pytest = None  # Plain `python tests/<file>.py` run: the pytest glue below is skipped
 
 # Configuration
 BASE_URL = "http://localhost:8000"
@@ -15,12 +22,36 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
-def print_section(title):
-    print("\n" + "="*80)
-    print(f"  {title}")
-    print("="*80)
+# Shared connection pool for all concurrently running scenarios
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+# One reusable compact encoder (json.dumps with custom options builds a new encoder per call)
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+_BY_CONFIDENCE = itemgetter('confidence')
+_STARS = ("", "⭐", "⭐⭐", "⭐⭐⭐", "⭐⭐⭐⭐", "⭐⭐⭐⭐⭐")  # Indexed by int(confidence * 5)
+
+class Out:
+    """Collects a scenario's report and writes it to stdout in a single call"""
+    
+    def __init__(self):
+        self.buf = []
+    
+    def p(self, *args):
+        self.buf.append(" ".join(map(str, args)) + "\n")
+    
+    def flush(self):
+        sys.stdout.write("".join(self.buf))
+        sys.stdout.flush()
+        self.buf.clear()
+
+def print_section(title, out=None):
+    emit = out.p if out else print
+    emit("\n" + "="*80)
+    emit(f"  {title}")
+    emit("="*80)
 
-def send_message(session_id, message_text):
+async def send_message(client, session_id, message_text):
     """Send a message and return response"""
     payload = {
         "sessionId": session_id,
@@ -37,123 +68,127 @@ def send_message(session_id, message_text):
         }
     }
     
-    response = requests.post(f"{BASE_URL}/api/message", headers=HEADERS, json=payload)
+    response = await client.post(f"{BASE_URL}/api/message", content=_encode(payload).encode())
     return response.json()
 
-def get_detailed_intelligence(session_id, threshold=0.0):
+async def get_detailed_intelligence(client, session_id, threshold=0.0):
     """Get detailed confidence-weighted intelligence"""
-    response = requests.get(
+    response = await client.get(
         f"{BASE_URL}/api/session/{session_id}/intelligence",
-        headers=HEADERS,
         params={"threshold": threshold}
     )
     return response.json()
 
-def test_scenario_1_bank_fraud():
+async def wait_for_intelligence(client, session_id, threshold=0.0, attempts=20, interval=0.05):
+    """Poll the intelligence endpoint until the session's item count and confidence stop changing"""
+    intel = await get_detailed_intelligence(client, session_id, threshold)
+    for _ in range(attempts):
+        await asyncio.sleep(interval)
+        latest = await get_detailed_intelligence(client, session_id, threshold)
+        if (latest.get('totalItemsExtracted'), latest.get('overallConfidence')) == \
+                (intel.get('totalItemsExtracted'), intel.get('overallConfidence')):
+            return latest
+        intel = latest
+    return intel
+
+async def scenario_1_bank_fraud(client, out):
     """Test: Bank fraud with account number and urgency"""
-    print_section("SCENARIO 1: Bank Fraud with High Confidence")
-    
     session_id = "test-confidence-001"
     
     # Message with bank account + urgency + sensitive keywords
     message = "URGENT! Your SBI bank account 123456789012 will be blocked. Share OTP to verify immediately."
     
-    print(f"\n📨 Scammer message: {message}")
-    
-    response = send_message(session_id, message)
-    print(f"\n✅ Status: {response['status']}")
-    print(f"📝 Agent Reply: {response['reply']}")
-    
-    time.sleep(1)  # Brief pause for processing
+    response = await send_message(client, session_id, message)
     
     # Get detailed intelligence
-    intel = get_detailed_intelligence(session_id)
+    intel = await wait_for_intelligence(client, session_id)
+    
+    # All requests are done - buffer the whole report and write it in one go
+    print_section("SCENARIO 1: Bank Fraud with High Confidence", out)
+    out.p(f"\n📨 Scammer message: {message}")
+    out.p(f"\n✅ Status: {response['status']}")
+    out.p(f"📝 Agent Reply: {response['reply']}")
     
-    print(f"\n📊 INTELLIGENCE METRICS:")
-    print(f"   Overall Confidence: {intel['overallConfidence']:.2%}")
-    print(f"   High Confidence Items: {intel['highConfidenceCount']}")
-    print(f"   Total Items: {intel['totalItemsExtracted']}")
+    out.p(f"\n📊 INTELLIGENCE METRICS:")
+    out.p(f"   Overall Confidence: {intel['overallConfidence']:.2%}")
+    out.p(f"   High Confidence Items: {intel['highConfidenceCount']}")
+    out.p(f"   Total Items: {intel['totalItemsExtracted']}")
     
-    print(f"\n🏦 BANK ACCOUNTS EXTRACTED:")
+    out.p(f"\n🏦 BANK ACCOUNTS EXTRACTED:")
     for item in intel['detailedIntelligence']['bankAccounts']:
-        print(f"   • Value: {item['value']}")
-        print(f"     Confidence: {item['confidence']:.2%} ⭐")
-        print(f"     Occurrences: {item['occurrences']}x")
-        print(f"     Context: {item['context'][:60]}...")
+        out.p(f"   • Value: {item['value']}")
+        out.p(f"     Confidence: {item['confidence']:.2%} ⭐")
+        out.p(f"     Occurrences: {item['occurrences']}x")
+        out.p(f"     Context: {item['context'][:60]}...")
     
-    print(f"\n🔑 SUSPICIOUS KEYWORDS:")
+    out.p(f"\n🔑 SUSPICIOUS KEYWORDS:")
     for item in intel['detailedIntelligence']['suspiciousKeywords'][:5]:
-        print(f"   • {item['value']}: {item['confidence']:.2%}")
+        out.p(f"   • {item['value']}: {item['confidence']:.2%}")
     
-    print(f"\n📈 CONFIDENCE DISTRIBUTION:")
+    out.p(f"\n📈 CONFIDENCE DISTRIBUTION:")
     dist = intel['confidenceDistribution']
-    print(f"   Very High (≥90%): {dist['veryHigh']} items")
-    print(f"   High (70-89%): {dist['high']} items")
-    print(f"   Medium (50-69%): {dist['medium']} items")
-    print(f"   Low (<50%): {dist['low']} items")
+    out.p(f"   Very High (≥90%): {dist['veryHigh']} items")
+    out.p(f"   High (70-89%): {dist['high']} items")
+    out.p(f"   Medium (50-69%): {dist['medium']} items")
+    out.p(f"   Low (<50%): {dist['low']} items")
     
+    out.flush()
     return session_id
 
-def test_scenario_2_upi_fraud():
+async def scenario_2_upi_fraud(client, out):
     """Test: UPI fraud with payment context"""
-    print_section("SCENARIO 2: UPI Fraud with Payment Context")
-    
     session_id = "test-confidence-002"
     
     # Message with UPI ID and payment context
     message = "Send payment to scammer@paytm immediately. UPI ID: fraudster123@phonepe. Transfer Rs.5000 now!"
     
-    print(f"\n📨 Scammer message: {message}")
+    response = await send_message(client, session_id, message)
     
-    response = send_message(session_id, message)
-    print(f"\n✅ Status: {response['status']}")
-    print(f"📝 Agent Reply: {response['reply']}")
+    intel = await wait_for_intelligence(client, session_id, threshold=0.6)  # Filter high confidence only
     
-    time.sleep(1)
+    print_section("SCENARIO 2: UPI Fraud with Payment Context", out)
+    out.p(f"\n📨 Scammer message: {message}")
+    out.p(f"\n✅ Status: {response['status']}")
+    out.p(f"📝 Agent Reply: {response['reply']}")
     
-    intel = get_detailed_intelligence(session_id, threshold=0.6)  # Filter high confidence only
+    out.p(f"\n📊 HIGH CONFIDENCE INTELLIGENCE (≥60%):")
+    out.p(f"   Overall Confidence: {intel['overallConfidence']:.2%}")
     
-    print(f"\n📊 HIGH CONFIDENCE INTELLIGENCE (≥60%):")
-    print(f"   Overall Confidence: {intel['overallConfidence']:.2%}")
-    
-    print(f"\n💳 UPI IDs EXTRACTED:")
+    out.p(f"\n💳 UPI IDs EXTRACTED:")
     for item in intel['detailedIntelligence']['upiIds']:
-        print(f"   • Value: {item['value']}")
-        print(f"     Confidence: {item['confidence']:.2%} ⭐")
-        print(f"     First Seen: {item['firstSeen']}")
+        out.p(f"   • Value: {item['value']}")
+        out.p(f"     Confidence: {item['confidence']:.2%} ⭐")
+        out.p(f"     First Seen: {item['firstSeen']}")
     
+    out.flush()
     return session_id
 
-def test_scenario_3_phishing_links():
+async def scenario_3_phishing_links(client, out):
     """Test: Phishing with suspicious links"""
-    print_section("SCENARIO 3: Phishing with Suspicious Links")
-    
     session_id = "test-confidence-003"
     
     # Message with phishing link
     message = "Click this link immediately to verify: https://bit.ly/fake-bank-verify and update your password now!"
     
-    print(f"\n📨 Scammer message: {message}")
+    response = await send_message(client, session_id, message)
     
-    response = send_message(session_id, message)
-    print(f"\n✅ Status: {response['status']}")
+    intel = await wait_for_intelligence(client, session_id)
     
-    time.sleep(1)
+    print_section("SCENARIO 3: Phishing with Suspicious Links", out)
+    out.p(f"\n📨 Scammer message: {message}")
+    out.p(f"\n✅ Status: {response['status']}")
     
-    intel = get_detailed_intelligence(session_id)
-    
-    print(f"\n🔗 PHISHING LINKS EXTRACTED:")
+    out.p(f"\n🔗 PHISHING LINKS EXTRACTED:")
     for item in intel['detailedIntelligence']['phishingLinks']:
-        print(f"   • URL: {item['value']}")
-        print(f"     Confidence: {item['confidence']:.2%} ⭐")
-        print(f"     (Short URL detected - higher confidence)")
+        out.p(f"   • URL: {item['value']}")
+        out.p(f"     Confidence: {item['confidence']:.2%} ⭐")
+        out.p(f"     (Short URL detected - higher confidence)")
     
+    out.flush()
     return session_id
 
-def test_scenario_4_repetition_boost():
+async def scenario_4_repetition_boost(client, out):
     """Test: Confidence boost from repetition"""
-    print_section("SCENARIO 4: Confidence Boost from Repetition")
-    
     session_id = "test-confidence-004"
     
     messages = [
@@ -162,43 +197,46 @@ def test_scenario_4_repetition_boost():
         "Urgent! Call 9876543210 now to verify your account"
     ]
     
-    for i, message in enumerate(messages, 1):
-        print(f"\n📨 Message {i}: {message}")
-        response = send_message(session_id, message)
-        print(f"   Reply: {response['reply']}")
-        time.sleep(0.5)
+    # Messages of one session stay in order; only the scenarios run concurrently
+    replies = []
+    for message in messages:
+        response = await send_message(client, session_id, message)
+        replies.append(response['reply'])
     
-    intel = get_detailed_intelligence(session_id)
+    intel = await wait_for_intelligence(client, session_id)
     
-    print(f"\n📞 PHONE NUMBERS EXTRACTED:")
+    print_section("SCENARIO 4: Confidence Boost from Repetition", out)
+    for i, (message, reply) in enumerate(zip(messages, replies), 1):
+        out.p(f"\n📨 Message {i}: {message}")
+        out.p(f"   Reply: {reply}")
+    
+    out.p(f"\n📞 PHONE NUMBERS EXTRACTED:")
     for item in intel['detailedIntelligence']['phoneNumbers']:
-        print(f"   • Number: {item['value']}")
-        print(f"     Confidence: {item['confidence']:.2%} ⭐")
-        print(f"     Seen {item['occurrences']}x (confidence boosted by repetition!)")
+        out.p(f"   • Number: {item['value']}")
+        out.p(f"     Confidence: {item['confidence']:.2%} ⭐")
+        out.p(f"     Seen {item['occurrences']}x (confidence boosted by repetition!)")
     
+    out.flush()
     return session_id
 
-def test_scenario_5_mixed_context():
+async def scenario_5_mixed_context(client, out):
     """Test: Mixed high and low confidence items"""
-    print_section("SCENARIO 5: Mixed Confidence Levels")
-    
     session_id = "test-confidence-005"
     
     # Message with both high and low confidence indicators
     message = "Account 987654321012345 blocked. Random number 12345 here. Call 9123456789. Visit generic-site.com or https://secure-bank-verify.tk"
     
-    print(f"\n📨 Scammer message: {message}")
-    
-    response = send_message(session_id, message)
+    response = await send_message(client, session_id, message)
     
-    time.sleep(1)
+    intel = await wait_for_intelligence(client, session_id)
     
-    intel = get_detailed_intelligence(session_id)
+    print_section("SCENARIO 5: Mixed Confidence Levels", out)
+    out.p(f"\n📨 Scammer message: {message}")
     
-    print(f"\n📊 CONFIDENCE BREAKDOWN:")
-    print(f"   Overall: {intel['overallConfidence']:.2%}")
+    out.p(f"\n📊 CONFIDENCE BREAKDOWN:")
+    out.p(f"   Overall: {intel['overallConfidence']:.2%}")
     
-    print(f"\n🔢 ALL EXTRACTED ITEMS BY CONFIDENCE:")
+    out.p(f"\n🔢 ALL EXTRACTED ITEMS BY CONFIDENCE:")
     
     # Combine all items
     all_items = []
@@ -212,15 +250,34 @@ def test_scenario_5_mixed_context():
                 })
     
     # Sort by confidence
-    all_items.sort(key=lambda x: x['confidence'], reverse=True)
+    all_items.sort(key=_BY_CONFIDENCE, reverse=True)
     
     for item in all_items:
-        stars = "⭐" * int(item['confidence'] * 5)
-        print(f"   • [{item['type']}] {item['value']}: {item['confidence']:.2%} {stars}")
+        stars = _STARS[int(item['confidence'] * 5)]
+        out.p(f"   • [{item['type']}] {item['value']}: {item['confidence']:.2%} {stars}")
     
+    out.flush()
     return session_id
 
-def main():
+SCENARIOS = (
+    scenario_1_bank_fraud,
+    scenario_2_upi_fraud,
+    scenario_3_phishing_links,
+    scenario_4_repetition_boost,
+    scenario_5_mixed_context,
+)
+
+async def run_scenario(scenario):
+    """Run one scenario on its own client (used when collected by pytest)"""
+    async with httpx.AsyncClient(limits=LIMITS, timeout=30.0, headers=HEADERS) as client:
+        return await scenario(client, Out())
+
+if pytest is not None:
+    @pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda scenario: scenario.__name__)
+    def test_scenario(scenario):
+        asyncio.run(run_scenario(scenario))
+
+async def main():
     """Run all confidence-weighted extraction tests"""
     print_section("🎯 CONFIDENCE-WEIGHTED INTELLIGENCE EXTRACTION TEST SUITE")
     print("\nDemonstrating 100% Complete Feature:")
@@ -231,20 +288,9 @@ def main():
     print("✅ Detailed intelligence tracking")
     
     try:
-        # Run all scenarios
-        test_scenario_1_bank_fraud()
-        time.sleep(2)
-        
-        test_scenario_2_upi_fraud()
-        time.sleep(2)
-        
-        test_scenario_3_phishing_links()
-        time.sleep(2)
-        
-        test_scenario_4_repetition_boost()
-        time.sleep(2)
-        
-        test_scenario_5_mixed_context()
+        # Run all scenarios concurrently - each one uses its own session ID
+        async with httpx.AsyncClient(limits=LIMITS, timeout=30.0, headers=HEADERS) as client:
+            await asyncio.gather(*(scenario(client, Out()) for scenario in SCENARIOS))
         
         print_section("✅ ALL TESTS COMPLETED SUCCESSFULLY")
         print("\n🎉 Confidence-Weighted Extraction: 100% COMPLETE")
@@ -263,4 +309,5 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
+    sys.stdout.reconfigure(line_buffering=False)  # Scenario reports are flushed explicitly
+    asyncio.run(main())
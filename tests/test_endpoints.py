@@ -0,0 +1,72 @@
+"""Probe the message endpoint with an empty body and the correct format
+
+Usage: python tests/test_endpoints.py [local] [live]   (default: both)
+"""
+import json
+import sys
+
+import requests
+
+from _session import SESSION
+
+ENDPOINTS = [
+    ("local", "http://localhost:8000/api/message"),
+    ("live", "https://ai-agentic-honeypot-system.onrender.com/api/message"),
+]
+headers = {
+    "x-api-key": "honeypot-secret-2026",
+    "Content-Type": "application/json"
+}
+SESSION.headers.update(headers)
+
+CORRECT_BODY = {
+    "sessionId": "test-123",
+    "message": {
+        "sender": "scammer",
+        "text": "URGENT: Your account will be blocked. Share OTP now.",
+        "timestamp": "2026-02-01T15:00:00Z"
+    },
+    "conversationHistory": [],
+    "metadata": {
+        "channel": "SMS",
+        "language": "English",
+        "locale": "IN"
+    }
+}
+
+
+def probe(session, name: str, url: str):
+    """Send the empty-body and correct-format probes to one endpoint"""
+    # Test 1: Empty body (what GUVI tester sends)
+    print("=" * 80)
+    print(f"[{name}] TEST 1: Empty body: {{}}")
+    print("=" * 80)
+    response = session.post(url, json={}, timeout=10)
+    print(f"Status Code: {response.status_code}")
+    print(f"Response:\n{json.dumps(response.json(), indent=2)}\n")
+    
+    # Test 2: Correct format
+    print("=" * 80)
+    print(f"[{name}] TEST 2: Correct format")
+    print("=" * 80)
+    response = session.post(url, json=CORRECT_BODY, timeout=10)
+    print(f"Status Code: {response.status_code}")
+    print(f"Response:\n{json.dumps(response.json(), indent=2)}\n")
+
+
+if __name__ == "__main__":
+    selected = set(sys.argv[1:])
+    results = []
+    for name, url in ENDPOINTS:
+        if not selected or name in selected:
+            # One unreachable endpoint must not hide the others
+            try:
+                probe(SESSION, name, url)
+                results.append((name, "✅ reachable"))
+            except requests.RequestException as e:
+                print(f"❌ [{name}] {url} failed: {e}\n")
+                results.append((name, f"❌ {type(e).__name__}"))
+    
+    print("=" * 80)
+    for name, status in results:
+        print(f"{name}: {status}")
@@ -1,4 +1,5 @@
-﻿import requests
+﻿import asyncio
+import httpx
 import json
 
 url = "https://ai-agentic-honeypot-system.onrender.com/api/message"
@@ -14,12 +15,25 @@ test_cases = [
     {"sessionId": "test", "message": {"text": "test"}},  # Nested but minimal
 ]
 
-for i, body in enumerate(test_cases, 1):
+
+async def run():
+    """Send all test cases at once over one connection pool"""
+    limits = httpx.Limits(max_keepalive_connections=5, max_connections=5)
+    async with httpx.AsyncClient(headers=headers, timeout=10, limits=limits) as client:
+        return await asyncio.gather(
+            *[client.post(url, json=body) for body in test_cases],
+            return_exceptions=True
+        )
+
+
+# Print in test order from the gathered results
+for i, (body, response) in enumerate(zip(test_cases, asyncio.run(run())), 1):
     print(f"\n{'='*60}")
     print(f"TEST {i}: {json.dumps(body)}")
     print('='*60)
     try:
-        response = requests.post(url, json=body, headers=headers, timeout=10)
+        if isinstance(response, Exception):
+            raise response
         print(f"Status: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
     except Exception as e:
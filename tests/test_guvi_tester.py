@@ -1,6 +1,6 @@
 """Test what the GUVI tester might be sending"""
-import requests
-import json
+import asyncio
+import httpx
 
 url = "http://localhost:8000/api/message"
 headers = {
@@ -8,44 +8,40 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# (label, extra post() kwargs)
+probes = [
+    ("1. Empty JSON body: {}", {"json": {}}),
+    ("2. Null body", {"json": None}),
+    ("3. Raw request with no data", {}),  # No json parameter (raw empty body)
+]
+
+
+async def run():
+    """Fire all probes at once over one connection pool"""
+    limits = httpx.Limits(max_keepalive_connections=3, max_connections=3)
+    async with httpx.AsyncClient(headers=headers, timeout=10, limits=limits) as client:
+        return await asyncio.gather(
+            *[client.post(url, **kwargs) for _, kwargs in probes],
+            return_exceptions=True
+        )
+
+
 print("Testing what GUVI endpoint tester might send...")
 print("=" * 80)
 
-# Test 1: Completely empty body
-print("\n1. Empty JSON body: {}")
-try:
-    r = requests.post(url, json={}, headers=headers, timeout=10)
-    print(f"Status: {r.status_code}")
-    if r.status_code == 200:
-        print(f"✅ SUCCESS")
-    else:
-        print(f"❌ FAILED: {r.text[:200]}")
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-
-# Test 2: No body at all (null)
-print("\n2. Null body")
-try:
-    r = requests.post(url, json=None, headers=headers, timeout=10)
-    print(f"Status: {r.status_code}")
-    if r.status_code == 200:
-        print(f"✅ SUCCESS")
-    else:
-        print(f"❌ FAILED: {r.text[:200]}")
-except Exception as e:
-    print(f"❌ ERROR: {e}")
-
-# Test 3: No json parameter (raw empty body)
-print("\n3. Raw request with no data")
-try:
-    r = requests.post(url, headers=headers, timeout=10)
-    print(f"Status: {r.status_code}")
-    if r.status_code == 200:
-        print(f"✅ SUCCESS")
-    else:
-        print(f"❌ FAILED: {r.text[:200]}")
-except Exception as e:
-    print(f"❌ ERROR: {e}")
+# Print in probe order from the gathered results
+for (label, _), r in zip(probes, asyncio.run(run())):
+    print(f"\n{label}")
+    try:
+        if isinstance(r, Exception):
+            raise r
+        print(f"Status: {r.status_code}")
+        if r.status_code == 200:
+            print(f"✅ SUCCESS")
+        else:
+            print(f"❌ FAILED: {r.text[:200]}")
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
 
 print("\n" + "=" * 80)
 print("Testing complete!")
@@ -4,10 +4,16 @@ Simulates realistic multi-turn scammer conversations to test your deployed syste
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+
+from _output import per_thread_stdout
 
 # ===================================
 # CONFIGURATION - UPDATE THESE!
@@ -19,12 +25,26 @@ BASE_URL = "https://ai-agentic-honeypot-system-finale.onrender.com"  # ⚠️ CH
 # Your API key
 API_KEY = "honeypot-secret-2026"  # Your actual API key
 
+# One keep-alive session for the whole run (no new TCP/TLS handshake per message)
+SESSION = requests.Session()
+# Idempotent requests (the /health warm-up) back off on 429/503 too, honoring Retry-After.
+# urllib3's default allowed_methods never retries POST /api/message on a read or status
+# error: the server records every turn, so a resend would duplicate it
+_retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 503))
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=_retry)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+SESSION.headers.update({
+    "x-api-key": API_KEY,
+    "Content-Type": "application/json"
+})
+
 # ===================================
 # Realistic Scammer Conversations
 # ===================================
 
 SCAMMER_SCENARIOS = {
-    "bank_fraud": [
+    "bank_fraud": (
         "URGENT: Your account will be blocked in 2 hours due to suspicious activity.",
         "You need to verify your account immediately by sharing OTP.",
         "I am calling from State Bank of India security department.",
@@ -32,61 +52,74 @@ SCAMMER_SCENARIOS = {
         "If you don't share OTP, your account will be permanently blocked.",
         "I need your card CVV to reverse the fraudulent transaction.",
         "Transfer ₹1 to this UPI: security@sbi to verify your account.",
-    ],
+    ),
     
-    "upi_fraud": [
+    "upi_fraud": (
         "Congratulations! You have won ₹50,000 in Google Pay lucky draw.",
         "To claim your prize, share your Google Pay UPI ID.",
         "My UPI ID is rewards@paytm - send ₹1 to verify your account.",
         "Now send the OTP you received to complete verification.",
         "You need to pay ₹500 processing fee to receive ₹50,000.",
-    ],
+    ),
     
-    "phishing": [
+    "phishing": (
         "Your KYC is pending. Update immediately or account will be suspended.",
         "Click this link to update: bit.ly/kyc-update-urgent",
         "If link doesn't work, go to sbi-kyc-update.com and enter your details.",
         "You need to enter card number, CVV, and OTP on that website.",
         "Don't worry, it's completely secure official website.",
-    ],
+    ),
     
-    "lottery_scam": [
+    "lottery_scam": (
         "Congratulations! You won ₹25 lakhs in KBC lucky draw!",
         "To claim prize, you need to pay ₹5,000 processing fee first.",
         "Send money to this account: 1234567890, IFSC: SBIN0001234",
         "After payment, prize money will be transferred within 24 hours.",
         "This is genuine offer from Sony TV and Amitabh Bachchan.",
-    ],
+    ),
     
-    "tech_support": [
+    "tech_support": (
         "This is Microsoft technical support. Your Windows license expired.",
         "We detected virus on your computer. Need immediate action.",
         "Download this teamviewer: download-teamviewer.info/secure",
         "Give me the teamviewer ID so I can fix your computer.",
         "There will be ₹2,999 charge for virus removal service.",
-    ]
+    )
 }
 
+# Scenarios run at once by "Run ALL Scenarios" (keeps load on the deployment's LLM throttle modest)
+MAX_PARALLEL_SCENARIOS = 3
+
+# Intelligence categories: (key, per-response label, summary count label, summary item label)
+INTEL_FIELDS = (
+    ('bankAccounts', '💳 Bank Accounts', '💳 Bank Accounts', 'Accounts'),
+    ('upiIds', '💰 UPI IDs', '💰 UPI IDs', 'UPI IDs'),
+    ('phishingLinks', '🔗 Links', '🔗 Phishing Links', 'Links'),
+    ('phoneNumbers', '📱 Phone Numbers', '📱 Phone Numbers', 'Numbers'),
+)
+INTEL_KEYS = tuple(field[0] for field in INTEL_FIELDS)
+
 # ===================================
 # Test Functions
 # ===================================
 
-def send_message(session_id, message_text, message_number=1):
-    """Send a message to the API and get response"""
-    
-    url = f"{BASE_URL}/api/message"
-    
-    headers = {
-        "x-api-key": API_KEY,
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
+# UTC ISO-8601 with a literal Z suffix, rendered in one strftime call
+_TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+def _ts(base, offset_seconds=0):
+    """UTC timestamp string for base shifted by offset_seconds"""
+    return (base + timedelta(seconds=offset_seconds)).strftime(_TS_FORMAT)
+
+
+def make_payload_template(session_id):
+    """Request payload for one session; send_message only fills in the message text and timestamp"""
+    return {
         "sessionId": session_id,
         "message": {
             "sender": "scammer",
-            "text": message_text,
-            "timestamp": datetime.now().isoformat() + "Z"
+            "text": "",
+            "timestamp": ""
         },
         "conversationHistory": [],
         "metadata": {
@@ -95,6 +128,23 @@ def send_message(session_id, message_text, message_number=1):
             "locale": "IN"
         }
     }
+
+
+def prepare_message_request(template):
+    """Prepared POST for one conversation: session headers merged once, only the body changes per message"""
+    return SESSION.prepare_request(requests.Request("POST", f"{BASE_URL}/api/message", json=template))
+
+
+def send_message(session_id, message_text, message_number=1, timestamp=None, template=None, prepared=None):
+    """Send a message to the API and get response"""
+    
+    url = f"{BASE_URL}/api/message"
+    
+    # Reuse the conversation's template when given (serialized before the next mutation)
+    payload = template or make_payload_template(session_id)
+    message = payload["message"]
+    message["text"] = message_text
+    message["timestamp"] = timestamp or _ts(datetime.now(timezone.utc))
     
     try:
         print(f"\n📤 Message #{message_number} (Scammer):")
@@ -102,7 +152,13 @@ def send_message(session_id, message_text, message_number=1):
         print(f"   Sending... ", end="", flush=True)
         
         start_time = time.time()
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        if prepared is not None:
+            body = json.dumps(payload).encode()
+            prepared.body = body
+            prepared.headers["Content-Length"] = str(len(body))
+            response = SESSION.send(prepared, timeout=30)
+        else:
+            response = SESSION.post(url, json=payload, timeout=30)
         duration = time.time() - start_time
         
         print(f"✅ ({duration:.2f}s)")
@@ -110,31 +166,30 @@ def send_message(session_id, message_text, message_number=1):
         if response.status_code == 200:
             data = response.json()
             
+            # Buffer the response report and write it in one go
+            buf = []
+            w = buf.append
+            
             # Show agent response
             if data.get("agentResponse"):
-                print(f"\n💬 Agent Response:")
-                print(f"   {data['agentResponse']}")
+                w(f"\n💬 Agent Response:\n")
+                w(f"   {data['agentResponse']}\n")
             
             # Show scam detection
-            print(f"\n🔍 Detection:")
-            print(f"   Scam Detected: {data.get('scamDetected', False)}")
+            w(f"\n🔍 Detection:\n")
+            w(f"   Scam Detected: {data.get('scamDetected', False)}\n")
             if data.get('agentNotes'):
-                print(f"   Type: {data['agentNotes']}")
+                w(f"   Type: {data['agentNotes']}\n")
             
             # Show extracted intelligence
-            intel = data.get('extractedIntelligence', {})
-            if any([intel.get('bankAccounts'), intel.get('upiIds'), 
-                   intel.get('phishingLinks'), intel.get('phoneNumbers')]):
-                print(f"\n🎯 Intelligence Extracted:")
-                if intel.get('bankAccounts'):
-                    print(f"   💳 Bank Accounts: {', '.join(intel['bankAccounts'])}")
-                if intel.get('upiIds'):
-                    print(f"   💰 UPI IDs: {', '.join(intel['upiIds'])}")
-                if intel.get('phishingLinks'):
-                    print(f"   🔗 Links: {', '.join(intel['phishingLinks'])}")
-                if intel.get('phoneNumbers'):
-                    print(f"   📱 Phone Numbers: {', '.join(intel['phoneNumbers'])}")
+            intel = data.get('extractedIntelligence') or {}
+            hits = [(label, values) for key, label, _, _ in INTEL_FIELDS if (values := intel.get(key))]
+            if hits:
+                w(f"\n🎯 Intelligence Extracted:\n")
+                for label, values in hits:
+                    w(f"   {label}: {', '.join(values)}\n")
             
+            sys.stdout.write("".join(buf))
             return data
             
         else:
@@ -163,61 +218,92 @@ def test_conversation(scenario_name, messages, delay=2):
     
     results = []
     
+    # One clock read per conversation; messages get synthetic one-second-apart timestamps
+    base_ts = datetime.now(timezone.utc)
+    template = make_payload_template(session_id)
+    history = template["conversationHistory"]  # Serialized by each send_message call
+    prepared = prepare_message_request(template)
+    
     for i, message in enumerate(messages, 1):
-        result = send_message(session_id, message, i)
+        ts = _ts(base_ts, i)
+        next_send = time.monotonic() + delay  # Pace sends start-to-start; the round-trip counts toward the delay
+        result = send_message(session_id, message, i, timestamp=ts, template=template, prepared=prepared)
         results.append(result)
         
+        # Grow the history like a real client: every turn resends the same prefix plus the new exchange
+        if result:
+            history.append({"sender": "scammer", "text": message, "timestamp": ts})
+            if result.get('agentResponse'):
+                history.append({"sender": "user", "text": result['agentResponse'], "timestamp": ts})
+        
         if result and result.get('sessionComplete'):
             print(f"\n⛔ Session ended by agent (safety)")
             break
         
-        # Wait between messages to simulate real conversation
+        # Wait between messages to simulate real conversation (no extra wait after a slow response)
         if i < len(messages):
-            print(f"\n⏳ Waiting {delay}s before next message...")
-            time.sleep(delay)
-    
-    # Summary
-    print("\n" + "="*80)
-    print("📊 CONVERSATION SUMMARY")
-    print("="*80)
-    
+            remaining = next_send - time.monotonic()
+            if remaining > 0:
+                print(f"\n⏳ Waiting {remaining:.1f}s before next message...")
+                time.sleep(remaining)
+    
+    # Summary (buffered, written once)
+    buf = []
+    w = buf.append
+    w("\n" + "="*80 + "\n")
+    w("📊 CONVERSATION SUMMARY\n")
+    w("="*80 + "\n")
+    
+    # One set per category, built in a single pass over the responses that carried intelligence
+    intels = [r['extractedIntelligence'] for r in results if r and r.get('extractedIntelligence')]
     total_intel = {
-        'bankAccounts': set(),
-        'upiIds': set(),
-        'phishingLinks': set(),
-        'phoneNumbers': set()
+        key: set(chain.from_iterable(intel.get(key, ()) for intel in intels))
+        for key in INTEL_KEYS
     }
     
-    for result in results:
-        if result and result.get('extractedIntelligence'):
-            intel = result['extractedIntelligence']
-            total_intel['bankAccounts'].update(intel.get('bankAccounts', []))
-            total_intel['upiIds'].update(intel.get('upiIds', []))
-            total_intel['phishingLinks'].update(intel.get('phishingLinks', []))
-            total_intel['phoneNumbers'].update(intel.get('phoneNumbers', []))
-    
-    print(f"✅ Messages Sent: {len(messages)}")
-    print(f"✅ Responses Received: {sum(1 for r in results if r)}")
-    print(f"\n🎯 Total Intelligence Collected:")
-    print(f"   💳 Bank Accounts: {len(total_intel['bankAccounts'])}")
-    print(f"   💰 UPI IDs: {len(total_intel['upiIds'])}")
-    print(f"   🔗 Phishing Links: {len(total_intel['phishingLinks'])}")
-    print(f"   📱 Phone Numbers: {len(total_intel['phoneNumbers'])}")
+    w(f"✅ Messages Sent: {len(messages)}\n")
+    w(f"✅ Responses Received: {sum(1 for r in results if r)}\n")
+    w(f"\n🎯 Total Intelligence Collected:\n")
+    for key, _, count_label, _ in INTEL_FIELDS:
+        w(f"   {count_label}: {len(total_intel[key])}\n")
     
     if any(total_intel.values()):
-        print(f"\n📋 Extracted Items:")
-        if total_intel['bankAccounts']:
-            print(f"   Accounts: {', '.join(total_intel['bankAccounts'])}")
-        if total_intel['upiIds']:
-            print(f"   UPI IDs: {', '.join(total_intel['upiIds'])}")
-        if total_intel['phishingLinks']:
-            print(f"   Links: {', '.join(total_intel['phishingLinks'])}")
-        if total_intel['phoneNumbers']:
-            print(f"   Numbers: {', '.join(total_intel['phoneNumbers'])}")
+        w(f"\n📋 Extracted Items:\n")
+        for key, _, _, item_label in INTEL_FIELDS:
+            if total_intel[key]:
+                w(f"   {item_label}: {', '.join(total_intel[key])}\n")
+    
+    sys.stdout.write("".join(buf))
     
     return results
 
 
+def run_all_scenarios(max_parallel=MAX_PARALLEL_SCENARIOS):
+    """Run every scenario, up to max_parallel at once; messages within a scenario stay serial"""
+    print(f"\n🚀 Running {len(SCAMMER_SCENARIOS)} scenarios, {max_parallel} at a time...")
+    
+    # Each scenario's output is buffered and printed as a block when it finishes
+    with per_thread_stdout() as stdout, ThreadPoolExecutor(max_workers=max_parallel) as ex:
+        futures = [
+            ex.submit(stdout.run_captured, test_conversation, name, messages)
+            for name, messages in SCAMMER_SCENARIOS.items()
+        ]
+        for future in as_completed(futures):
+            _, output = future.result()
+            stdout.write(output)
+
+
+def _warmup():
+    """Wake the deployment with one cheap /health GET"""
+    print(f"\n🔥 Warming up {BASE_URL} ... ", end="", flush=True)
+    start_time = time.time()
+    try:
+        SESSION.get(f"{BASE_URL}/health", timeout=35)
+    except Exception:
+        pass
+    print(f"{time.time() - start_time:.1f}s")
+
+
 def test_single_message():
     """Quick single message test"""
     print("\n🧪 QUICK TEST - Single Message")
@@ -274,7 +360,10 @@ def main():
         print("\n👋 Goodbye!")
         return
     
-    elif choice == "1":
+    # Absorb a Render cold start here, not inside the first measured message
+    _warmup()
+    
+    if choice == "1":
         test_single_message()
     
     elif choice == "2":
@@ -293,10 +382,7 @@ def main():
         test_conversation("tech_support", SCAMMER_SCENARIOS["tech_support"])
     
     elif choice == "7":
-        for scenario_name, messages in SCAMMER_SCENARIOS.items():
-            test_conversation(scenario_name, messages)
-            print("\n⏳ Waiting 5s before next scenario...")
-            time.sleep(5)
+        run_all_scenarios()
     
     elif choice == "8":
         custom_msg = input("\nEnter custom scammer message: ").strip()
@@ -2,121 +2,139 @@
 Test Rate Limiting and Cooldown Features
 """
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+try:
+    import pytest  # Only needed when the file is collected by pytest
+except ImportError:
+    pytest = None  # Plain `python tests/<file>.py` run: the pytest glue below is skipped
+
 from src.services.ai_agent import AIAgent
 
 
-def test_retry_delay_extraction():
-    """Test that retry delays are extracted from error messages"""
-    agent = AIAgent()
+class VirtualClock:
+    """Fake clock for ai_agent: sleep() advances time instantly instead of blocking"""
     
-    print("Testing retry delay extraction:")
-    print("-" * 50)
+    def __init__(self):
+        self.t = time.time()
     
-    # Test case 1: Standard format
-    error1 = "Please retry in 18.360292146s."
-    delay1 = agent._extract_retry_delay(error1)
-    print(f"  Error: '{error1[:40]}...'")
-    print(f"  Extracted: {delay1}s {'✅' if delay1 == 18.360292146 else '❌'}")
+    def time(self) -> float:
+        return self.t
     
-    # Test case 2: RetryInfo format
-    error2 = "{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': '14s'}"
-    delay2 = agent._extract_retry_delay(error2)
-    print(f"  Error: '{error2[:40]}...'")
-    print(f"  Extracted: {delay2}s {'✅' if delay2 == 14.0 else '❌'}")
+    def sleep(self, seconds: float):
+        self.t += seconds
     
-    # Test case 3: No delay in message
-    error3 = "Generic error message"
-    delay3 = agent._extract_retry_delay(error3)
-    print(f"  Error: '{error3}'")
-    print(f"  Extracted: {delay3}s (default) {'✅' if delay3 == 60.0 else '❌'}")
-    
-    print()
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.t)
+
+
+@contextmanager
+def virtual_clock():
+    """Run ai_agent's throttling/cooldown bookkeeping on a VirtualClock (no real waiting)"""
+    clock = VirtualClock()
+    with mock.patch('src.services.ai_agent.time', SimpleNamespace(time=clock.time, sleep=clock.sleep)), \
+            mock.patch('src.services.ai_agent.datetime', SimpleNamespace(now=clock.now)):
+        yield clock
+
+
+# (error message, expected delay, note)
+RETRY_DELAY_CASES = (
+    ("Please retry in 18.360292146s.", 18.360292146, ""),  # Standard format
+    ("{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': '14s'}", 14.0, ""),  # RetryInfo format
+    ("Generic error message", 60.0, " (default)"),  # No delay in message
+)
 
 
-def test_cooldown_tracking():
+def test_retry_delay_extraction(agent: AIAgent, error: str, expected: float, note: str):
+    """Test that a retry delay is extracted from an error message"""
+    delay = agent._extract_retry_delay(error)
+    print(f"  Error: '{error[:40]}...'" if len(error) > 40 else f"  Error: '{error}'")
+    print(f"  Extracted: {delay}s{note} {'✅' if delay == expected else '❌'}")
+    assert delay == expected
+
+
+def test_cooldown_tracking(agent: AIAgent):
     """Test cooldown setting and checking"""
-    agent = AIAgent()
-    
     print("Testing cooldown tracking:")
     print("-" * 50)
     
-    # Set cooldown for a provider
-    print("  Setting 5s cooldown for test_provider...")
-    agent._set_cooldown('test_provider', 5, is_model=False)
-    
-    # Check immediately
-    is_cooldown = agent._is_provider_in_cooldown('test_provider')
-    print(f"  Is in cooldown (immediate): {is_cooldown} {'✅' if is_cooldown else '❌'}")
-    
-    # Wait 3 seconds
-    print("  Waiting 3 seconds...")
-    time.sleep(3)
-    is_cooldown = agent._is_provider_in_cooldown('test_provider')
-    print(f"  Is in cooldown (after 3s): {is_cooldown} {'✅' if is_cooldown else '❌'}")
-    
-    # Wait 3 more seconds
-    print("  Waiting 3 more seconds...")
-    time.sleep(3)
-    is_cooldown = agent._is_provider_in_cooldown('test_provider')
-    print(f"  Is in cooldown (after 6s): {is_cooldown} {'❌' if is_cooldown else '✅'}")
+    with virtual_clock() as clock:
+        # Set cooldown for a provider
+        print("  Setting 5s cooldown for test_provider...")
+        agent._set_cooldown('test_provider', 5, is_model=False)
+        
+        # Check immediately
+        is_cooldown = agent._is_provider_in_cooldown('test_provider')
+        print(f"  Is in cooldown (immediate): {is_cooldown} {'✅' if is_cooldown else '❌'}")
+        
+        # Wait 3 seconds
+        print("  Waiting 3 seconds (virtual)...")
+        clock.sleep(3)
+        is_cooldown = agent._is_provider_in_cooldown('test_provider')
+        print(f"  Is in cooldown (after 3s): {is_cooldown} {'✅' if is_cooldown else '❌'}")
+        
+        # Wait 3 more seconds
+        print("  Waiting 3 more seconds (virtual)...")
+        clock.sleep(3)
+        is_cooldown = agent._is_provider_in_cooldown('test_provider')
+        print(f"  Is in cooldown (after 6s): {is_cooldown} {'❌' if is_cooldown else '✅'}")
     
     print()
 
 
-def test_model_cooldown():
+def test_model_cooldown(agent: AIAgent):
     """Test per-model cooldown"""
-    agent = AIAgent()
-    
     print("Testing model-specific cooldown:")
     print("-" * 50)
     
-    # Set cooldown for specific model
-    model = "models/gemini-test"
-    print(f"  Setting 3s cooldown for {model}...")
-    agent._set_cooldown(model, 3, is_model=True)
-    
-    is_cooldown = agent._is_model_in_cooldown(model)
-    print(f"  Model in cooldown: {is_cooldown} {'✅' if is_cooldown else '❌'}")
-    
-    # Wait for expiry
-    print("  Waiting for cooldown to expire...")
-    time.sleep(4)
-    
-    is_cooldown = agent._is_model_in_cooldown(model)
-    print(f"  Model still in cooldown: {is_cooldown} {'❌' if is_cooldown else '✅'}")
+    with virtual_clock() as clock:
+        # Set cooldown for specific model
+        model = "models/gemini-test"
+        print(f"  Setting 3s cooldown for {model}...")
+        agent._set_cooldown(model, 3, is_model=True)
+        
+        is_cooldown = agent._is_model_in_cooldown(model)
+        print(f"  Model in cooldown: {is_cooldown} {'✅' if is_cooldown else '❌'}")
+        
+        # Wait for expiry
+        print("  Waiting for cooldown to expire (virtual)...")
+        clock.sleep(4)
+        
+        is_cooldown = agent._is_model_in_cooldown(model)
+        print(f"  Model still in cooldown: {is_cooldown} {'❌' if is_cooldown else '✅'}")
     
     print()
 
 
-def test_throttling():
+def test_throttling(agent: AIAgent):
     """Test request throttling"""
-    agent = AIAgent()
-    
     print("Testing request throttling:")
     print("-" * 50)
     
-    # First request
-    print("  Making first request...")
-    start = time.time()
-    agent._throttle_request('test_provider')
-    elapsed1 = time.time() - start
-    print(f"  First request delay: {elapsed1:.2f}s (should be ~0s) {'✅' if elapsed1 < 0.1 else '❌'}")
-    
-    # Second request immediately after
-    print("  Making second request (should throttle)...")
-    start = time.time()
-    agent._throttle_request('test_provider')
-    elapsed2 = time.time() - start
-    print(f"  Second request delay: {elapsed2:.2f}s (should be ~12s) {'✅' if 11 < elapsed2 < 13 else '❌'}")
+    # Throttle sleeps advance the virtual clock, so "elapsed" is the delay the agent imposed
+    with virtual_clock() as clock:
+        # First request
+        print("  Making first request...")
+        start = clock.time()
+        agent._throttle_request('test_provider')
+        elapsed1 = clock.time() - start
+        print(f"  First request delay: {elapsed1:.2f}s (should be ~0s) {'✅' if elapsed1 < 0.1 else '❌'}")
+        
+        # Second request immediately after
+        print("  Making second request (should throttle)...")
+        start = clock.time()
+        agent._throttle_request('test_provider')
+        elapsed2 = clock.time() - start
+        print(f"  Second request delay: {elapsed2:.2f}s (should be ~12s) {'✅' if 11 < elapsed2 < 13 else '❌'}")
     
     print()
 
 
-def test_api_keys():
+def test_api_keys(agent: AIAgent):
     """Test API key configuration"""
-    agent = AIAgent()
-    
     print("Testing API key configuration:")
     print("-" * 50)
     
@@ -137,6 +155,17 @@ def test_api_keys():
     print()
 
 
+if pytest is not None:
+    @pytest.fixture(scope="module")
+    def agent() -> AIAgent:
+        """One agent for every check (provider discovery and client setup run once)"""
+        return AIAgent()
+    
+    test_retry_delay_extraction = pytest.mark.parametrize(
+        "error, expected, note", RETRY_DELAY_CASES
+    )(test_retry_delay_extraction)
+
+
 def main():
     print("=" * 60)
     print("RATE LIMITING TESTS")
@@ -144,11 +173,17 @@ def main():
     print()
     
     try:
-        test_retry_delay_extraction()
-        test_cooldown_tracking()
-        test_model_cooldown()
-        test_throttling()
-        test_api_keys()
+        agent = AIAgent()
+        print("Testing retry delay extraction:")
+        print("-" * 50)
+        for error, expected, note in RETRY_DELAY_CASES:
+            test_retry_delay_extraction(agent, error, expected, note)
+        print()
+        
+        test_cooldown_tracking(agent)
+        test_model_cooldown(agent)
+        test_throttling(agent)
+        test_api_keys(agent)
         
         print("=" * 60)
         print("✅ ALL TESTS COMPLETED")
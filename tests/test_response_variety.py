@@ -1,16 +1,26 @@
 """
 Test Response Variety - Demonstrate Non-Repetitive Responses
 """
+from functools import lru_cache
+
 from src.services.ai_agent import AIAgent
 
 
+@lru_cache(maxsize=1)
+def _agent() -> AIAgent:
+    """Build one shared agent for all scenarios, warmed on a throwaway session"""
+    agent = AIAgent()
+    agent._fallback_response("warmup", 1, "warmup")
+    return agent
+
+
 def test_otp_scenario():
     """Test OTP request responses for variety"""
     print("=" * 70)
     print("OTP REQUEST SCENARIO - Testing Response Variety")
     print("=" * 70)
     
-    agent = AIAgent()
+    agent = _agent()
     scammer_messages = [
         "Share your OTP code immediately",
         "Send me the 6-digit verification code",
@@ -58,7 +68,7 @@ def test_account_scenario():
     print("ACCOUNT BLOCKING SCENARIO - Testing Progression")
     print("=" * 70)
     
-    agent = AIAgent()
+    agent = _agent()
     scammer_messages = [
         "Your account will be blocked in 2 hours",
         "Your bank account is suspended",
@@ -90,7 +100,7 @@ def test_variety_statistics():
     print("TESTING NON-REPETITION (20 consecutive OTP requests)")
     print("=" * 70)
     
-    agent = AIAgent()
+    agent = _agent()
     msg = "Send me your OTP code now"
     session_id = "test-variety"
     
@@ -126,6 +136,32 @@ def test_variety_statistics():
         print(f"{i:2}. {resp}")
 
 
+def test_interleaved_sessions():
+    """Test that interleaved sessions each walk their own response cycle"""
+    print("\n" + "=" * 70)
+    print("TESTING INTERLEAVED SESSIONS (two sessions, alternating OTP requests)")
+    print("=" * 70)
+    
+    agent = _agent()
+    msg = "Send me your OTP code now"
+    pool_size = len(agent.FALLBACK_RESPONSES["otp"])
+    sessions = {"test-interleave-a": [], "test-interleave-b": []}
+    
+    # Alternate the two sessions through generate_response, the path the API uses
+    for i in range(1, pool_size + 1):
+        for session_id, responses in sessions.items():
+            decision = agent.generate_response(msg, [], message_count=i, session_id=session_id)
+            responses.append(decision['response'])
+    
+    for session_id, responses in sessions.items():
+        unique = len(set(responses))
+        print(f"  {session_id}: {unique}/{pool_size} distinct responses in {len(responses)} turns")
+        # Each session sees the whole pool once before anything repeats
+        assert unique == pool_size, f"{session_id} repeated a response within one cycle"
+    
+    print("\n✅ Each session cycles independently")
+
+
 def main():
     print("\n🎭 RESPONSE VARIETY TEST")
     print("Demonstrating realistic, non-repetitive honeypot responses\n")
@@ -134,6 +170,7 @@ def main():
         test_otp_scenario()
         test_account_scenario()
         test_variety_statistics()
+        test_interleaved_sessions()
         
         print("\n" + "=" * 70)
         print("KEY IMPROVEMENTS:")
@@ -55,6 +55,7 @@ try:
     print(f"   ✅ Has bankAccounts list: {'bankAccounts' in guvi_format}")
     print(f"   ✅ bankAccounts value: {guvi_format.get('bankAccounts', [])}")
     print(f"   ✅ Detailed fields excluded: {'bankAccountsDetailed' not in guvi_format}")
+    print(f"   ✅ to_guvi_dict matches model_dump: {result.to_guvi_dict() == guvi_format}")
     
     # Test confidence boost from repetition
     print("\n7. Testing repetition-based confidence boost...")